@@ -0,0 +1,88 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .models import ArchiveResult, Order, OrderStatus
+from .storage import (
+    DATA_DIR,
+    load_state,
+    read_gzip_json,
+    read_json,
+    save_gzip_json_atomic,
+    save_json_atomic,
+    save_orders,
+    with_write_lock,
+)
+
+ARCHIVE_DIR = DATA_DIR / "archive"
+ARCHIVE_INDEX = ARCHIVE_DIR / "index.json"
+
+
+def archive_month(order: Order) -> str:
+    reference = order.completed_at or order.due_date
+    return reference.strftime("%Y-%m")
+
+
+def partition_path(month: str) -> Path:
+    return ARCHIVE_DIR / f"orders-{month}.json.gz"
+
+
+def load_index() -> Dict[str, Dict[str, object]]:
+    index = read_json(ARCHIVE_INDEX) or {}
+    return {"orders": index.get("orders", {}), "months": index.get("months", {})}
+
+
+def is_archivable(order: Order, cutoff: datetime) -> bool:
+    if order.status != OrderStatus.done:
+        return False
+    return (order.completed_at or order.due_date) < cutoff
+
+
+def archive_orders(retention_days: Optional[int] = None, now: Optional[datetime] = None) -> ArchiveResult:
+    with with_write_lock():
+        state = load_state()
+        if retention_days is None:
+            retention_days = state["settings"].archive.get("retention_days", 90)
+        cutoff = (now or datetime.utcnow()) - timedelta(days=retention_days)
+        hot: List[Order] = []
+        cold: Dict[str, List[Order]] = defaultdict(list)
+        for order in state["orders"]:
+            if is_archivable(order, cutoff):
+                cold[archive_month(order)].append(order)
+            else:
+                hot.append(order)
+        index = load_index()
+        if cold:
+            ARCHIVE_DIR.mkdir(parents=True, exist_ok=True)
+            for month, orders in cold.items():
+                path = partition_path(month)
+                merged = {row["id"]: row for row in read_gzip_json(path) or []}
+                merged.update((order.id, order.dict()) for order in orders)
+                save_gzip_json_atomic(path, sorted(merged.values(), key=lambda row: row["id"]))
+                index["months"][month] = len(merged)
+                for order in orders:
+                    index["orders"][str(order.id)] = month
+            save_json_atomic(ARCHIVE_INDEX, index)
+            save_orders(hot)
+        return ArchiveResult(
+            archived=sum(len(orders) for orders in cold.values()),
+            hot_orders=len(hot),
+            months=index["months"],
+        )
+
+
+def load_archived_orders(month: Optional[str] = None, order_ids: Optional[Iterable[int]] = None) -> List[Order]:
+    index = load_index()
+    if order_ids is not None:
+        wanted = {int(order_id) for order_id in order_ids}
+        months = sorted({index["orders"][str(order_id)] for order_id in wanted if str(order_id) in index["orders"]})
+    else:
+        wanted = None
+        months = [month] if month else sorted(index["months"])
+    orders: List[Order] = []
+    for current in months:
+        for row in read_gzip_json(partition_path(current)) or []:
+            if wanted is None or row["id"] in wanted:
+                orders.append(Order(**row))
+    return orders
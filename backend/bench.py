@@ -0,0 +1,273 @@
+"""Performans ölçüm paketi.
+
+Sentetik veri seti üretir, depolama/planlama/KPI fonksiyonlarını ve ana HTTP
+uç noktalarını ASGI test istemcisi ile ölçer, sonuçları JSON dosyasına yazar:
+
+python -m backend.bench --orders 5000 --output bench_results.json
+python -m backend.bench --compare onceki.json
+
+TEKIZ_DATA_DIR, backend.storage içe aktarılmadan önce ayarlanmalıdır; bu yüzden
+uygulama modülleri main() içinde geç yüklenir.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from .synthetic import add_arguments, config_from_args, generate
+
+USERS = {
+    "admin": ("admin@example.com", "admin"),
+    "sales": ("satis@example.com", "satis"),
+    "planner": ("planlama@example.com", "plan"),
+}
+
+
+def measure(name: str, fn: Callable[[], Any], repeat: int) -> Dict[str, Any]:
+    durations: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - started) * 1000)
+    return {
+        "name": name,
+        "repeat": repeat,
+        "min_ms": round(min(durations), 3),
+        "median_ms": round(statistics.median(durations), 3),
+        "mean_ms": round(statistics.fmean(durations), 3),
+        "max_ms": round(max(durations), 3),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def bench_functions(repeat: int) -> List[Dict[str, Any]]:
+    from . import kpi, scheduler
+    from .storage import load_state, publish_schedule, read_events, rollback_to
+
+    results = [measure("load_state", load_state, repeat)]
+    draft = scheduler.run_scheduler(1, 1, 3)
+    results.append(measure("run_scheduler", lambda: scheduler.run_scheduler(1, 1, 3), repeat))
+    results.append(measure("calculate_kpi", lambda: kpi.calculate_kpi(draft), repeat))
+    results.append(measure("publish_schedule", lambda: publish_schedule(draft), repeat))
+    results.append(measure("rollback_to", lambda: rollback_to(draft.schedule.version), repeat))
+    results.append(measure("read_events", read_events, repeat))
+    results.append(measure("read_events_limit_200", lambda: read_events(limit=200), repeat))
+    return results
+
+
+def bench_writes(repeat: int, writes: int = 50) -> List[Dict[str, Any]]:
+    from .storage import DATA_DIR, DATA_FILES, Durability, flush_pending_writes, read_json, save_json_atomic
+
+    payload = read_json(DATA_FILES["orders"]) or []
+    target = DATA_DIR / "bench_write.json"
+    results = []
+    for mode in Durability:
+
+        def write_many() -> None:
+            for _ in range(writes):
+                save_json_atomic(target, payload, mode)
+            flush_pending_writes()
+
+        result = measure(f"save_json_atomic[{mode.value}] x{writes}", write_many, repeat)
+        result["ops_per_sec"] = round(writes / (result["median_ms"] / 1000), 1) if result["median_ms"] else None
+        results.append(result)
+    target.unlink(missing_ok=True)
+    return results
+
+
+def _expect(response, status: int = 200):
+    if response.status_code != status:
+        raise RuntimeError(f"{response.request.method} {response.request.url} -> {response.status_code}: {response.text[:200]}")
+    return response
+
+
+def bench_http(repeat: int) -> List[Dict[str, Any]]:
+    from fastapi.testclient import TestClient
+
+    from .main import app
+
+    results: List[Dict[str, Any]] = []
+    with TestClient(app) as client:
+        headers: Dict[str, Dict[str, str]] = {}
+        for role, (email, password) in USERS.items():
+            token = _expect(client.post("/auth/login", json={"email": email, "password": password})).json()["access_token"]
+            headers[role] = {"Authorization": f"Bearer {token}"}
+        results.append(
+            measure(
+                "POST /auth/login",
+                lambda: _expect(client.post("/auth/login", json={"email": USERS["admin"][0], "password": USERS["admin"][1]})),
+                repeat,
+            )
+        )
+        order_payload = {
+            "product_code": "P-00001",
+            "quantity": 50,
+            "due_date": datetime.utcnow().isoformat(),
+            "priority": 1,
+            "is_rush": False,
+        }
+        results.append(
+            measure("POST /orders", lambda: _expect(client.post("/orders", json=order_payload, headers=headers["sales"])), repeat)
+        )
+        results.append(measure("GET /orders", lambda: _expect(client.get("/orders", headers=headers["sales"])), repeat))
+        last_run: Dict[str, Any] = {}
+
+        def run_schedule() -> None:
+            last_run.update(_expect(client.post("/schedule/run", headers=headers["planner"])).json())
+
+        results.append(measure("POST /schedule/run", run_schedule, repeat))
+        schedule_id = last_run["draft"]["schedule"]["id"]
+        results.append(
+            measure(
+                "POST /schedule/publish",
+                lambda: _expect(client.post("/schedule/publish", json={"schedule_id": schedule_id}, headers=headers["planner"])),
+                repeat,
+            )
+        )
+        results.append(
+            measure("GET /schedule/current", lambda: _expect(client.get("/schedule/current", headers=headers["planner"])), repeat)
+        )
+        results.append(
+            measure(
+                "GET /kpi/summary",
+                lambda: _expect(client.get("/kpi/summary", params={"scheduleId": schedule_id}, headers=headers["planner"])),
+                repeat,
+            )
+        )
+        results.append(
+            measure(
+                "POST /schedule/rollback",
+                lambda: _expect(client.post("/schedule/rollback", json={"version": schedule_id}, headers=headers["planner"])),
+                repeat,
+            )
+        )
+        results.append(
+            measure("GET /settings/weights", lambda: _expect(client.get("/settings/weights", headers=headers["admin"])), repeat)
+        )
+        results.append(measure("GET /log", lambda: _expect(client.get("/log", headers=headers["admin"])), repeat))
+    return results
+
+
+def bench_burst(repeat: int, clients: int) -> List[Dict[str, Any]]:
+    """plan_updated yayını sonrası aynı anda gelen okuma dalgasını taklit eder."""
+    from fastapi.testclient import TestClient
+
+    from .main import app
+    from .singleflight import coalescer
+
+    results: List[Dict[str, Any]] = []
+    with TestClient(app) as client:
+        email, password = USERS["planner"]
+        token = _expect(client.post("/auth/login", json={"email": email, "password": password})).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+        schedule_id = _expect(client.post("/schedule/run", headers=headers)).json()["draft"]["schedule"]["id"]
+        _expect(client.post("/schedule/publish", json={"schedule_id": schedule_id}, headers=headers))
+        routes = [("/schedule/current", {}), ("/kpi/summary", {"scheduleId": schedule_id})]
+        with ThreadPoolExecutor(max_workers=clients) as pool:
+            for enabled in (True, False):
+                coalescer.enabled = enabled
+                for path, params in routes:
+
+                    def burst() -> None:
+                        requests = [pool.submit(client.get, path, params=params, headers=headers) for _ in range(clients)]
+                        for request in requests:
+                            _expect(request.result())
+
+                    label = "singleflight" if enabled else "direct"
+                    results.append(measure(f"GET {path} x{clients} [{label}]", burst, repeat))
+        coalescer.enabled = True
+    return results
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    previous = {(r["group"], r["name"]): r for r in baseline.get("results", [])}
+    rows = []
+    for result in current["results"]:
+        old = previous.get((result["group"], result["name"]))
+        if not old or not old["median_ms"]:
+            continue
+        rows.append(
+            {
+                "group": result["group"],
+                "name": result["name"],
+                "baseline_ms": old["median_ms"],
+                "current_ms": result["median_ms"],
+                "ratio": round(result["median_ms"] / old["median_ms"], 3),
+            }
+        )
+    return rows
+
+
+def main(argv: Optional[List[str]] = None) -> Dict[str, Any]:
+    parser = argparse.ArgumentParser(description="Tekiz üretim planlama performans ölçümü")
+    add_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=5, help="Her ölçüm için tekrar sayısı")
+    parser.add_argument("--data-dir", type=Path, default=None, help="Veri dizini (varsayılan: geçici dizin)")
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"), help="Sonuç dosyası")
+    parser.add_argument("--compare", type=Path, default=None, help="Karşılaştırılacak önceki sonuç dosyası")
+    parser.add_argument("--skip-http", action="store_true", help="HTTP uç noktalarını ölçme")
+    parser.add_argument("--burst-clients", type=int, default=32, help="Eşzamanlı okuma dalgasındaki istemci sayısı")
+    args = parser.parse_args(argv)
+
+    if "backend.storage" in sys.modules:
+        raise RuntimeError("backend.storage zaten yüklü; ölçüm ayrı bir süreçte çalıştırılmalı")
+    data_dir = args.data_dir or Path(tempfile.mkdtemp(prefix="tekiz-bench-"))
+    config = config_from_args(args)
+    os.environ["TEKIZ_DATA_DIR"] = str(data_dir)
+    counts = generate(data_dir, config)
+
+    results = [{"group": "function", **r} for r in bench_functions(args.repeat)]
+    results.extend({"group": "write", **r} for r in bench_writes(args.repeat))
+    if not args.skip_http:
+        results.extend({"group": "http", **r} for r in bench_http(args.repeat))
+        results.extend({"group": "burst", **r} for r in bench_burst(args.repeat, args.burst_clients))
+
+    report: Dict[str, Any] = {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.utcnow().isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "data_dir": str(data_dir),
+            "config": asdict(config),
+            "counts": counts,
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    for result in results:
+        line = f"{result['group']:<9} {result['name']:<34} median {result['median_ms']:>10.2f} ms"
+        if result.get("ops_per_sec"):
+            line += f" ({result['ops_per_sec']} yazma/sn)"
+        print(line)
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        for row in compare(report, baseline):
+            print(f"{row['group']:<9} {row['name']:<34} {row['baseline_ms']:>10.2f} -> {row['current_ms']:>10.2f} ms (x{row['ratio']})")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,18 @@
 from collections import defaultdict
+from typing import Any, Dict, Optional
 
+from .metrics import span
 from .models import KPI, ScheduleDraft
+from .shifts import AvailabilityIndex
 from .storage import load_state
 
 
-def calculate_kpi(schedule: ScheduleDraft) -> KPI:
-    state = load_state()
+def calculate_kpi(schedule: ScheduleDraft, state: Optional[Dict[str, Any]] = None) -> KPI:
+    with span("kpi.calculate_kpi"):
+        return calculate_kpi_from_state(schedule, state or load_state())
+
+
+def calculate_kpi_from_state(schedule: ScheduleDraft, state: Dict[str, Any]) -> KPI:
     order_lookup = {order.id: order for order in state["orders"]}
     product_lookup = {product.code: product for product in state["products"]}
     setup_matrix = {
@@ -38,14 +45,24 @@ def calculate_kpi(schedule: ScheduleDraft) -> KPI:
                 change_count += 1
                 setup_total += setup_matrix.get((prev_key, current_key), 0)
         prev_item[item.workcenter_id] = item
-        utilization_per_wc[item.workcenter_id].append(
-            int((item.end_ts - item.start_ts).total_seconds() // 60)
-        )
+        utilization_per_wc[item.workcenter_id].append(item)
     avg_utilization = 0.0
     if utilization_per_wc:
-        avg_utilization = sum(sum(v) for v in utilization_per_wc.values()) / max(
-            len(utilization_per_wc), 1
-        )
+        workcenter_lookup = {wc.id: wc for wc in state["workcenters"]}
+        ratios = []
+        for workcenter_id, wc_items in utilization_per_wc.items():
+            window_start = min(item.start_ts for item in wc_items)
+            window_end = max(item.end_ts for item in wc_items)
+            wc = workcenter_lookup.get(workcenter_id)
+            if wc is None:
+                busy = sum((item.end_ts - item.start_ts).total_seconds() / 60 for item in wc_items)
+                available = (window_end - window_start).total_seconds() / 60
+            else:
+                calendar = AvailabilityIndex(wc, window_start)
+                busy = sum(calendar.available_minutes(item.start_ts, item.end_ts) for item in wc_items)
+                available = calendar.available_minutes(window_start, window_end)
+            ratios.append(min(busy / available, 1.0) if available > 0 else 0.0)
+        avg_utilization = round(100 * sum(ratios) / len(ratios), 2)
     return KPI(
         total_lateness_min=lateness,
         total_setup_min=setup_total,
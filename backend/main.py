@@ -1,26 +1,65 @@
-from datetime import datetime
+import time
+from bisect import bisect_right
+from datetime import date, datetime
 from typing import List, Optional
 
-from fastapi import Depends, FastAPI, HTTPException, WebSocket
+from fastapi import Depends, FastAPI, HTTPException, Query, Request, WebSocket
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import FileResponse, PlainTextResponse, Response
+from starlette.concurrency import run_in_threadpool
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
-from . import kpi, scheduler
+from . import kpi, metrics, scenarios, scheduler
+from .archive import archive_orders, load_archived_orders
 from .models import (
     KPI,
+    ArchiveRequest,
+    ArchiveResult,
+    CalendarPayload,
+    DailyLoad,
     LoginRequest,
     Order,
     OrderCreate,
+    OrderLocation,
     OrderStatus,
+    PlanningUpdate,
+    ProfileSummary,
+    ProfilingConfig,
+    ProfilingUpdate,
     PublishRequest,
     RollbackRequest,
+    RollupSeries,
     Role,
+    RushCostUpdate,
+    RushInsertRequest,
+    ScenarioRequest,
+    ScenarioResponse,
+    Schedule,
+    ScheduleConflict,
+    ScheduleDiff,
     ScheduleDraft,
     ScheduleRunResponse,
     ScheduleStatus,
     SetupMatrixPayload,
     User,
     WeightUpdate,
+    WorkCenter,
+    WorkcenterQueue,
 )
+from .profiler import (
+    ProfiledRoute,
+    bound_to_profile,
+    current_session,
+    folded_stacks,
+    list_profiles,
+    load_profile,
+    profile_path,
+    profiler,
+)
+from .sequence import next_id
+from .singleflight import coalescer, encode_json
 from .security import (
     authenticate_user,
     create_access_token,
@@ -30,13 +69,16 @@ from .security import (
 )
 from .storage import (
     append_event,
+    current_version,
     ensure_files,
+    event_rollups,
+    flush_pending_writes,
     load_draft,
     load_latest_schedule,
     load_state,
+    load_view,
     log_order_created,
     log_schedule_run,
-    next_id,
     publish_schedule,
     read_events,
     rollback_to,
@@ -44,10 +86,14 @@ from .storage import (
     save_orders,
     save_settings,
     save_setup_matrix,
+    save_workcenters,
+    with_write_lock,
 )
+from .views import order_shard, parse_ts
 from .websocket import manager
 
 app = FastAPI(title="İnsan Onaylı Üretim Planlama")
+app.router.route_class = ProfiledRoute
 
 app.add_middleware(
     CORSMiddleware,
@@ -58,9 +104,70 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        route_path = getattr(route, "path", "unmatched")
+        metrics.observe_request(request.method, route_path, status, time.perf_counter() - started)
+
+
+def _match_route_path(scope: Scope) -> str:
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", "unmatched")
+    return "unmatched"
+
+
+class ProfilingMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not profiler.config.enabled:
+            await self.app(scope, receive, send)
+            return
+        session = profiler.start(scope["method"], _match_route_path(scope), scope["path"])
+        if session is None:
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        token = current_session.set(session)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            current_session.reset(token)
+            await run_in_threadpool(profiler.finish, session, status, time.perf_counter() - started)
+
+
+app.add_middleware(ProfilingMiddleware)
+
+
 @app.on_event("startup")
 def startup() -> None:
     ensure_files()
+    archive_orders()
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    flush_pending_writes()
+    scenarios.shutdown_pool()
 
 
 @app.post("/auth/login")
@@ -75,8 +182,7 @@ def login(payload: LoginRequest):
 
 @app.post("/orders", response_model=Order, dependencies=[Depends(require_roles(Role.sales))])
 def create_order(payload: OrderCreate, current_user: User = Depends(get_current_user)) -> Order:
-    state = load_state()
-    new_id, settings = next_id(state["settings"], "orders")
+    new_id = next_id("orders")
     order = Order(
         id=new_id,
         product_code=payload.product_code,
@@ -87,70 +193,272 @@ def create_order(payload: OrderCreate, current_user: User = Depends(get_current_
         status=OrderStatus.new,
         created_at=datetime.utcnow(),
     )
-    orders = state["orders"] + [order]
-    save_orders(orders)
-    save_settings(settings)
+    with with_write_lock():
+        state = load_state()
+        orders = state["orders"] + [order]
+        save_orders(orders)
     log_order_created(order, current_user.id)
     return order
 
 
 @app.get("/orders", response_model=List[Order])
-def list_orders(status: Optional[OrderStatus] = None, user: User = Depends(get_current_user)) -> List[Order]:
+def list_orders(
+    status: Optional[OrderStatus] = None,
+    include_archived: bool = False,
+    archived_month: Optional[str] = Query(None, pattern=r"^\d{4}-\d{2}$"),
+    ids: Optional[List[int]] = Query(None),
+    user: User = Depends(get_current_user),
+) -> List[Order]:
     state = load_state()
     orders = state["orders"]
+    if ids:
+        wanted = set(ids)
+        orders = [order for order in orders if order.id in wanted]
+        missing = wanted - {order.id for order in orders}
+        if missing:
+            orders = orders + load_archived_orders(order_ids=missing)
+    elif include_archived or archived_month:
+        hot_ids = {order.id for order in orders}
+        archived = load_archived_orders(month=archived_month)
+        orders = orders + [order for order in archived if order.id not in hot_ids]
     if status:
         orders = [order for order in orders if order.status == status]
     return orders
 
 
+@app.post(
+    "/orders/{order_id}/complete",
+    response_model=Order,
+    dependencies=[Depends(require_roles(Role.production, Role.planner))],
+)
+def complete_order(order_id: int, current_user: User = Depends(get_current_user)) -> Order:
+    with with_write_lock():
+        orders = load_state()["orders"]
+        order = next((order for order in orders if order.id == order_id), None)
+        if not order:
+            raise HTTPException(status_code=404, detail="Sipariş bulunamadı")
+        order.status = OrderStatus.done
+        order.completed_at = datetime.utcnow()
+        save_orders(orders)
+    append_event({"actor": current_user.id, "event": "order_completed", "payload": {"order_id": order_id}})
+    return order
+
+
+@app.post("/admin/archive", response_model=ArchiveResult, dependencies=[Depends(require_roles(Role.admin))])
+def run_archive(payload: ArchiveRequest, user: User = Depends(get_current_user)) -> ArchiveResult:
+    result = archive_orders(payload.retention_days)
+    append_event({"actor": user.id, "event": "orders_archived", "payload": {"archived": result.archived}})
+    return result
+
+
 @app.post("/schedule/run", response_model=ScheduleRunResponse, dependencies=[Depends(require_roles(Role.planner))])
 def run_schedule(current_user: User = Depends(get_current_user)) -> ScheduleRunResponse:
-    state = load_state()
-    schedule_id, settings = next_id(state["settings"], "schedule")
+    schedule_id = next_id("schedule")
     version = schedule_id
     draft = scheduler.run_scheduler(schedule_id, version, current_user.id)
     save_draft(draft)
-    save_settings(settings)
     log_schedule_run(draft, current_user.id)
     kpi_result = kpi.calculate_kpi(draft)
     return ScheduleRunResponse(draft=draft, kpi=kpi_result)
 
 
-@app.post("/schedule/publish", dependencies=[Depends(require_roles(Role.planner))])
-async def publish_schedule_endpoint(payload: PublishRequest, current_user: User = Depends(get_current_user)) -> ScheduleDraft:
+@app.post("/schedule/scenarios", response_model=ScenarioResponse, dependencies=[Depends(require_roles(Role.planner))])
+def evaluate_scenarios(payload: ScenarioRequest, current_user: User = Depends(get_current_user)) -> ScenarioResponse:
+    names = [spec.name for spec in payload.scenarios]
+    if len(set(names)) != len(names):
+        raise HTTPException(status_code=400, detail="Senaryo adları benzersiz olmalı")
+    snapshot = load_state()
+    snapshot.pop("users", None)
+    snapshot.pop("draft", None)
+    results = scenarios.run_scenarios(payload.scenarios, snapshot)
+    append_event(
+        {"actor": current_user.id, "event": "scenarios_evaluated", "payload": {"scenarios": names}}
+    )
+    return ScenarioResponse(results=results, pareto=[result.name for result in results if result.pareto_optimal])
+
+
+def _publish_draft(payload: PublishRequest) -> ScheduleDraft:
     draft = load_draft()
     if not draft or draft.schedule.id != payload.schedule_id:
         raise HTTPException(status_code=404, detail="Taslak bulunamadı")
+    conflicts = scheduler.find_conflicts(draft.items, load_state()["workcenters"])
+    if conflicts:
+        raise HTTPException(status_code=409, detail=[conflict.dict() for conflict in conflicts[:50]])
     draft.schedule.status = ScheduleStatus.published
-    published = publish_schedule(draft)
-    save_draft(draft)
-    await manager.broadcast({"type": "plan_updated", "version": draft.schedule.version})
-    append_event({"actor": current_user.id, "event": "email_mock", "payload": {"message": "Plan güncellendi"}})
+    with with_write_lock():
+        published = publish_schedule(draft)
+        save_draft(draft)
+    return published
+
+
+@app.post("/schedule/publish", dependencies=[Depends(require_roles(Role.planner))])
+async def publish_schedule_endpoint(payload: PublishRequest, current_user: User = Depends(get_current_user)) -> ScheduleDraft:
+    published = await run_in_threadpool(bound_to_profile(_publish_draft), payload)
+    await manager.broadcast({"type": "plan_updated", "version": published.schedule.version})
+    await run_in_threadpool(
+        append_event, {"actor": current_user.id, "event": "email_mock", "payload": {"message": "Plan güncellendi"}}
+    )
     return published
 
 
+def _insert_rush_order(payload: RushInsertRequest, current_user: User) -> ScheduleDiff:
+    with with_write_lock():
+        base = load_latest_schedule()
+        if not base:
+            raise HTTPException(status_code=404, detail="Yayınlı plan yok")
+        if payload.base_version is not None and payload.base_version != base.schedule.version:
+            raise HTTPException(status_code=409, detail="Yayınlı plan değişti")
+        state = load_state()
+        order_lookup = {order.id: order for order in state["orders"]}
+        order = order_lookup.get(payload.order_id)
+        if not order:
+            raise HTTPException(status_code=404, detail="Sipariş bulunamadı")
+        if order.status == OrderStatus.done:
+            raise HTTPException(status_code=400, detail="Sipariş tamamlanmış")
+        if not order.is_rush:
+            raise HTTPException(status_code=400, detail="Sipariş acil değil")
+        if any(item.order_id == order.id for item in base.items):
+            raise HTTPException(status_code=409, detail="Sipariş zaten planda")
+        schedule_id = next_id("schedule")
+        schedule = Schedule(
+            id=schedule_id,
+            version=schedule_id,
+            status=ScheduleStatus.published,
+            created_at=datetime.utcnow(),
+            created_by=current_user.id,
+        )
+        result = scheduler.insert_rush_order(
+            base,
+            order,
+            schedule,
+            state["workcenters"],
+            {(row.from_key, row.to_key): row.setup_minutes for row in state["setup_matrix"]},
+            {product.code: product for product in state["products"]},
+            order_lookup,
+            scheduler.RushCostConfig(state["settings"].rush_costs),
+            frozen_minutes=state["settings"].planning.get("frozen_minutes", 0),
+        )
+        if result is None:
+            raise HTTPException(status_code=409, detail="Uygun iş merkezi bulunamadı")
+        draft, diff = result
+        pointer = current_version()
+        if pointer and pointer["version"] != base.schedule.version:
+            raise HTTPException(status_code=409, detail="Yayınlı plan değişti")
+        publish_schedule(draft)
+        append_event(
+            {
+                "actor": current_user.id,
+                "event": "rush_inserted",
+                "payload": {"order_id": order.id, "version": diff.version, "moved": len(diff.moved)},
+            }
+        )
+        return diff
+
+
+@app.post("/schedule/rush", response_model=ScheduleDiff, dependencies=[Depends(require_roles(Role.planner))])
+async def insert_rush_order(payload: RushInsertRequest, current_user: User = Depends(get_current_user)) -> ScheduleDiff:
+    diff = await run_in_threadpool(bound_to_profile(_insert_rush_order), payload, current_user)
+    await manager.broadcast({"type": "plan_patched", **jsonable_encoder(diff)})
+    return diff
+
+
 @app.post("/schedule/rollback", dependencies=[Depends(require_roles(Role.planner, Role.admin))])
 def rollback(payload: RollbackRequest, current_user: User = Depends(get_current_user)) -> ScheduleDraft:
-    schedule = rollback_to(payload.version)
+    with with_write_lock():
+        schedule = rollback_to(payload.version)
     if not schedule:
         raise HTTPException(status_code=404, detail="Versiyon bulunamadı")
     return schedule
 
 
-@app.get("/schedule/current", response_model=ScheduleDraft)
-def get_current_schedule(user: User = Depends(get_current_user)) -> ScheduleDraft:
+def _current_version() -> int:
+    pointer = current_version()
+    if not pointer:
+        raise HTTPException(status_code=404, detail="Yayınlı plan yok")
+    return pointer["version"]
+
+
+def _encoded_current_schedule() -> bytes:
     schedule = load_latest_schedule()
     if not schedule:
         raise HTTPException(status_code=404, detail="Yayınlı plan yok")
-    return schedule
+    return encode_json(schedule)
 
 
-@app.get("/kpi/summary", response_model=KPI)
-def get_kpi(scheduleId: int, user: User = Depends(get_current_user)) -> KPI:
+@app.get("/schedule/current", response_model=ScheduleDraft)
+async def get_current_schedule(user: User = Depends(get_current_user)) -> Response:
+    version = await run_in_threadpool(_current_version)
+    content = await coalescer.do(("/schedule/current", version), bound_to_profile(_encoded_current_schedule))
+    return Response(content=content, media_type="application/json")
+
+
+@app.get("/schedule/current/workcenters/{workcenter_id}/queue", response_model=WorkcenterQueue)
+def get_workcenter_queue(
+    workcenter_id: int,
+    after: Optional[datetime] = None,
+    limit: int = 20,
+    user: User = Depends(get_current_user),
+) -> WorkcenterQueue:
+    version = _current_version()
+    items = load_view(version, f"workcenter_{workcenter_id}.json") or []
+    cursor = parse_ts(after) if after else datetime.utcnow()
+    start = bisect_right(items, cursor, key=lambda item: parse_ts(item["end_ts"]))
+    return WorkcenterQueue(
+        version=version,
+        workcenter_id=workcenter_id,
+        total=len(items),
+        items=items[start : start + max(limit, 0)],
+    )
+
+
+@app.get("/schedule/current/orders/{order_id}", response_model=OrderLocation)
+def get_order_location(order_id: int, user: User = Depends(get_current_user)) -> OrderLocation:
+    version = _current_version()
+    entries = load_view(version, f"orders_{order_shard(order_id)}.json") or {}
+    items = entries.get(str(order_id))
+    if not items:
+        raise HTTPException(status_code=404, detail="Sipariş planda yok")
+    return OrderLocation(version=version, order_id=order_id, items=items)
+
+
+@app.get("/schedule/current/load", response_model=DailyLoad)
+def get_daily_load(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    user: User = Depends(get_current_user),
+) -> DailyLoad:
+    version = _current_version()
+    days = load_view(version, "daily_load.json") or {}
+    if start or end:
+        low = start.isoformat() if start else ""
+        high = end.isoformat() if end else "9999-12-31"
+        days = {day: load for day, load in days.items() if low <= day <= high}
+    return DailyLoad(version=version, days=days)
+
+
+@app.get("/schedule/conflicts", response_model=List[ScheduleConflict])
+def get_schedule_conflicts(source: str = "draft", user: User = Depends(get_current_user)) -> List[ScheduleConflict]:
+    schedule = load_latest_schedule() if source == "current" else load_draft()
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Plan bulunamadı")
+    return scheduler.find_conflicts(schedule.items, load_state()["workcenters"])
+
+
+def _encoded_kpi(schedule_id: int) -> bytes:
     schedule = load_latest_schedule()
-    if not schedule or schedule.schedule.id != scheduleId:
+    if not schedule or schedule.schedule.id != schedule_id:
+        raise HTTPException(status_code=404, detail="Schedule bulunamadı")
+    return encode_json(kpi.calculate_kpi(schedule))
+
+
+@app.get("/kpi/summary", response_model=KPI)
+async def get_kpi(scheduleId: int, user: User = Depends(get_current_user)) -> Response:
+    pointer = await run_in_threadpool(current_version)
+    if not pointer:
         raise HTTPException(status_code=404, detail="Schedule bulunamadı")
-    return kpi.calculate_kpi(schedule)
+    key = ("/kpi/summary", pointer["version"], scheduleId)
+    content = await coalescer.do(key, bound_to_profile(lambda: _encoded_kpi(scheduleId)))
+    return Response(content=content, media_type="application/json")
 
 
 @app.post("/settings/weights", dependencies=[Depends(require_roles(Role.admin))])
@@ -176,6 +484,68 @@ def get_weights(user: User = Depends(get_current_user)) -> dict:
     return state["settings"].weights
 
 
+@app.post("/settings/planning", dependencies=[Depends(require_roles(Role.admin))])
+def update_planning(payload: PlanningUpdate, user: User = Depends(get_current_user)) -> dict:
+    state = load_state()
+    settings = state["settings"]
+    settings.planning = payload.dict()
+    save_settings(settings)
+    append_event({"actor": user.id, "event": "planning_updated", "payload": payload.dict()})
+    return settings.planning
+
+
+@app.get("/settings/planning")
+def get_planning(user: User = Depends(get_current_user)) -> dict:
+    state = load_state()
+    return state["settings"].planning
+
+
+@app.post("/settings/rush-costs", dependencies=[Depends(require_roles(Role.admin))])
+def update_rush_costs(payload: RushCostUpdate, user: User = Depends(get_current_user)) -> dict:
+    state = load_state()
+    settings = state["settings"]
+    settings.rush_costs = payload.dict()
+    save_settings(settings)
+    append_event({"actor": user.id, "event": "rush_costs_updated", "payload": payload.dict()})
+    return settings.rush_costs
+
+
+@app.get("/settings/rush-costs")
+def get_rush_costs(user: User = Depends(get_current_user)) -> dict:
+    state = load_state()
+    return state["settings"].rush_costs
+
+
+@app.get("/settings/workcenters", response_model=List[WorkCenter])
+def get_workcenters(user: User = Depends(get_current_user)) -> List[WorkCenter]:
+    return load_state()["workcenters"]
+
+
+@app.post(
+    "/settings/workcenters/{workcenter_id}/calendar",
+    response_model=WorkCenter,
+    dependencies=[Depends(require_roles(Role.admin))],
+)
+def update_workcenter_calendar(
+    workcenter_id: int, payload: CalendarPayload, user: User = Depends(get_current_user)
+) -> WorkCenter:
+    workcenters = load_state()["workcenters"]
+    target = next((wc for wc in workcenters if wc.id == workcenter_id), None)
+    if not target:
+        raise HTTPException(status_code=404, detail="İş merkezi bulunamadı")
+    target.shifts = payload.shifts
+    target.downtimes = payload.downtimes
+    save_workcenters(workcenters)
+    append_event(
+        {
+            "actor": user.id,
+            "event": "calendar_updated",
+            "payload": {"workcenter_id": workcenter_id, "shifts": len(payload.shifts), "downtimes": len(payload.downtimes)},
+        }
+    )
+    return target
+
+
 @app.get("/settings/setup-matrix")
 def get_setup_matrix(user: User = Depends(get_current_user)) -> List[dict]:
     state = load_state()
@@ -187,6 +557,69 @@ def get_log(user: User = Depends(get_current_user)) -> List[dict]:
     return read_events(limit=200)
 
 
+@app.get("/admin/profiling", response_model=ProfilingConfig, dependencies=[Depends(require_roles(Role.admin))])
+def get_profiling_config() -> ProfilingConfig:
+    return profiler.config
+
+
+@app.post("/admin/profiling", response_model=ProfilingConfig, dependencies=[Depends(require_roles(Role.admin))])
+def update_profiling_config(payload: ProfilingUpdate, user: User = Depends(get_current_user)) -> ProfilingConfig:
+    config = profiler.configure(payload)
+    append_event({"actor": user.id, "event": "profiling_updated", "payload": config.dict()})
+    return config
+
+
+@app.get("/admin/profiles", response_model=List[ProfileSummary], dependencies=[Depends(require_roles(Role.admin))])
+def get_profiles() -> List[ProfileSummary]:
+    return list_profiles()
+
+
+@app.get("/admin/profiles/{profile_id}", response_model=ProfileSummary, dependencies=[Depends(require_roles(Role.admin))])
+def get_profile(profile_id: str) -> ProfileSummary:
+    profile = load_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profil bulunamadı")
+    return ProfileSummary(**profile)
+
+
+@app.get("/admin/profiles/{profile_id}/download", dependencies=[Depends(require_roles(Role.admin))])
+def download_profile(profile_id: str, format: str = "json"):
+    path = profile_path(profile_id)
+    if not path:
+        raise HTTPException(status_code=404, detail="Profil bulunamadı")
+    if format == "folded":
+        return PlainTextResponse(
+            folded_stacks(load_profile(profile_id) or {}),
+            headers={"Content-Disposition": f'attachment; filename="profile_{profile_id}.folded"'},
+        )
+    return FileResponse(path, media_type="application/json", filename=path.name)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics() -> PlainTextResponse:
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/log/rollups", response_model=RollupSeries)
+def get_log_rollups(
+    granularity: str = Query("day", pattern="^(hour|day)$"),
+    event: Optional[str] = None,
+    actor: Optional[str] = None,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    group_by: Optional[str] = Query(None, pattern="^(event|actor)$"),
+    user: User = Depends(get_current_user),
+) -> RollupSeries:
+    points = event_rollups.series(granularity, event=event, actor=actor, start=start, end=end, group_by=group_by)
+    return RollupSeries(granularity=granularity, event=event, actor=actor, group_by=group_by, points=points)
+
+
+@app.post("/admin/rollups/rebuild", dependencies=[Depends(require_roles(Role.admin))])
+def rebuild_log_rollups(user: User = Depends(get_current_user)) -> dict:
+    event_rollups.rebuild()
+    return {"offset": event_rollups.offset}
+
+
 @app.websocket("/realtime")
 async def realtime(websocket: WebSocket):
     connection_id = await manager.connect(websocket)
@@ -1,8 +1,8 @@
-from datetime import datetime
+from datetime import datetime, time
 from enum import Enum
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, conint
 
 
 class Role(str, Enum):
@@ -44,10 +44,35 @@ class Product(BaseModel):
     setup_key: str
 
 
+class BreakWindow(BaseModel):
+    start: time
+    end: time
+
+
+class ShiftWindow(BaseModel):
+    start: time
+    end: time
+    weekdays: List[conint(ge=0, le=6)] = Field(default_factory=lambda: [0, 1, 2, 3, 4, 5, 6], min_items=1)
+    breaks: List[BreakWindow] = Field(default_factory=list)
+
+
+class Downtime(BaseModel):
+    start: datetime
+    end: datetime
+    reason: str = ""
+
+
 class WorkCenter(BaseModel):
     id: int
     name: str
     capacity_per_shift: int = Field(..., ge=1)
+    shifts: List[ShiftWindow] = Field(default_factory=list)
+    downtimes: List[Downtime] = Field(default_factory=list)
+
+
+class CalendarPayload(BaseModel):
+    shifts: List[ShiftWindow] = Field(default_factory=list)
+    downtimes: List[Downtime] = Field(default_factory=list)
 
 
 class SetupMatrixRow(BaseModel):
@@ -65,6 +90,7 @@ class Order(BaseModel):
     is_rush: bool = False
     status: OrderStatus = OrderStatus.new
     created_at: datetime
+    completed_at: Optional[datetime] = None
 
 
 class OrderCreate(BaseModel):
@@ -90,11 +116,43 @@ class ScheduleItem(BaseModel):
     start_ts: datetime
     end_ts: datetime
     sequence_no: int
+    frozen: bool = False
+
+
+class QueueEntry(ScheduleItem):
+    position: int
+
+
+class WorkcenterQueue(BaseModel):
+    version: int
+    workcenter_id: int
+    total: int
+    items: List[QueueEntry]
+
+
+class OrderLocation(BaseModel):
+    version: int
+    order_id: int
+    items: List[QueueEntry]
+
+
+class DailyLoad(BaseModel):
+    version: int
+    days: Dict[str, Dict[str, float]]
+
+
+class RoughCutBucket(BaseModel):
+    period_start: datetime
+    period_end: datetime
+    order_count: int
+    quantity: int
+    load_minutes: int
 
 
 class ScheduleDraft(BaseModel):
     schedule: Schedule
     items: List[ScheduleItem]
+    rough_cut: List[RoughCutBucket] = Field(default_factory=list)
 
 
 class KPI(BaseModel):
@@ -112,6 +170,18 @@ class Settings(BaseModel):
         "w4": 2,
     })
     counters: dict = Field(default_factory=dict)
+    planning: dict = Field(default_factory=lambda: {
+        "horizon_days": 14,
+        "frozen_minutes": 120,
+        "rough_cut_bucket_days": 7,
+    })
+    rush_costs: dict = Field(default_factory=lambda: {
+        "lateness": 3,
+        "setup": 5,
+        "completion": 1,
+        "push": 2,
+    })
+    archive: dict = Field(default_factory=lambda: {"retention_days": 90})
 
 
 class LoginRequest(BaseModel):
@@ -139,6 +209,26 @@ class RollbackRequest(BaseModel):
     version: int
 
 
+class ScheduleConflict(BaseModel):
+    workcenter_id: int
+    order_id: int
+    reason: str
+    other_order_id: Optional[int] = None
+
+
+class RushInsertRequest(BaseModel):
+    order_id: int
+    base_version: Optional[int] = None
+
+
+class ScheduleDiff(BaseModel):
+    schedule_id: int
+    base_version: int
+    version: int
+    added: List[ScheduleItem] = Field(default_factory=list)
+    moved: List[ScheduleItem] = Field(default_factory=list)
+
+
 class WeightUpdate(BaseModel):
     w1: int
     w2: int
@@ -146,12 +236,103 @@ class WeightUpdate(BaseModel):
     w4: int
 
 
+class ArchiveRequest(BaseModel):
+    retention_days: Optional[int] = Field(None, ge=0)
+
+
+class ArchiveResult(BaseModel):
+    archived: int
+    hot_orders: int
+    months: Dict[str, int]
+
+
+class PlanningUpdate(BaseModel):
+    horizon_days: int = Field(..., ge=1)
+    frozen_minutes: int = Field(..., ge=0)
+    rough_cut_bucket_days: int = Field(..., ge=1)
+
+
+class RushCostUpdate(BaseModel):
+    lateness: float = Field(..., ge=0)
+    setup: float = Field(..., ge=0)
+    completion: float = Field(..., ge=0)
+    push: float = Field(..., ge=0)
+
+
 class SetupMatrixPayload(BaseModel):
     rows: List[SetupMatrixRow]
 
 
+class ScenarioSpec(BaseModel):
+    name: str
+    weights: Optional[WeightUpdate] = None
+    setup_matrix: Optional[List[SetupMatrixRow]] = None
+
+
+class ScenarioRequest(BaseModel):
+    scenarios: List[ScenarioSpec] = Field(..., min_items=1, max_items=32)
+
+
+class ScenarioResult(BaseModel):
+    name: str
+    weights: dict
+    kpi: KPI
+    item_count: int
+    pareto_optimal: bool
+
+
+class ScenarioResponse(BaseModel):
+    results: List[ScenarioResult]
+    pareto: List[str]
+
+
 class LogEntry(BaseModel):
     timestamp: datetime
     actor: Optional[str]
     event: str
     payload: dict = Field(default_factory=dict)
+
+
+class ProfilingConfig(BaseModel):
+    enabled: bool = False
+    threshold_ms: Optional[int] = Field(None, ge=0)
+    route: Optional[str] = None
+    remaining: int = Field(0, ge=0)
+    interval_ms: int = Field(5, ge=1)
+    max_profiles: int = Field(20, ge=1)
+
+
+class ProfilingUpdate(BaseModel):
+    enabled: Optional[bool] = None
+    threshold_ms: Optional[int] = Field(None, ge=0)
+    route: Optional[str] = None
+    remaining: Optional[int] = Field(None, ge=0)
+    interval_ms: Optional[int] = Field(None, ge=1)
+    max_profiles: Optional[int] = Field(None, ge=1)
+
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    route: str
+    path: str
+    status: int
+    reason: str
+    started_at: datetime
+    duration_ms: float
+    sample_count: int
+    top_functions: List[dict] = Field(default_factory=list)
+
+
+class RollupPoint(BaseModel):
+    bucket: str
+    key: Optional[str] = None
+    count: int
+
+
+class RollupSeries(BaseModel):
+    granularity: str
+    event: Optional[str] = None
+    actor: Optional[str] = None
+    group_by: Optional[str] = None
+    points: List[RollupPoint]
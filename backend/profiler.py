@@ -0,0 +1,280 @@
+import asyncio
+import functools
+import os
+import sys
+import threading
+import time
+from collections import Counter as TallyCounter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from fastapi.routing import APIRoute
+
+from .models import ProfileSummary, ProfilingConfig, ProfilingUpdate
+from .storage import DATA_DIR, Durability, read_json, save_json_atomic
+
+PROFILE_DIR = DATA_DIR / "profiles"
+PACKAGE_DIR = str(Path(__file__).resolve().parent)
+PROFILER_FILE = str(Path(__file__).resolve())
+MAX_STACK_DEPTH = 64
+
+Frame = Tuple[str, int, str]
+
+current_session: "ContextVar[Optional[ProfileSession]]" = ContextVar("tekiz_profile_session", default=None)
+
+
+class StackSampler(threading.Thread):
+    """Tüm profil oturumları için tek örnekleyici.
+
+    Yalnızca bir oturuma bağlanmış (uç noktayı çalıştıran) iş parçacıkları
+    örneklenir ve her örnek o oturuma yazılır; bağlı iş parçacığı yokken
+    uyur.
+    """
+
+    def __init__(self, interval: float) -> None:
+        super().__init__(name="tekiz-profiler", daemon=True)
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._threads: Dict[int, "ProfileSession"] = {}
+        self._active = threading.Event()
+
+    def attach(self, thread_id: int, session: "ProfileSession") -> None:
+        with self._lock:
+            self._threads[thread_id] = session
+            self._active.set()
+
+    def detach(self, thread_id: int) -> None:
+        with self._lock:
+            self._threads.pop(thread_id, None)
+
+    def run(self) -> None:
+        while True:
+            self._active.wait()
+            time.sleep(self.interval)
+            with self._lock:
+                targets = list(self._threads.items())
+                if not targets:
+                    self._active.clear()
+                    continue
+            frames = sys._current_frames()
+            for thread_id, session in targets:
+                frame = frames.get(thread_id)
+                stack = _extract_stack(frame) if frame is not None else None
+                if stack:
+                    session.record(stack)
+
+
+def _extract_stack(frame) -> Optional[Tuple[Frame, ...]]:
+    frames: List[Frame] = []
+    in_package = False
+    while frame is not None and len(frames) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        frame = frame.f_back
+        if code.co_filename == PROFILER_FILE:
+            continue
+        if code.co_filename.startswith(PACKAGE_DIR):
+            in_package = True
+        frames.append((code.co_filename, code.co_firstlineno, code.co_name))
+    if not in_package:
+        return None
+    frames.reverse()
+    return tuple(frames)
+
+
+class ProfileSession:
+    def __init__(self, method: str, route: str, path: str, reason: str, interval_ms: int) -> None:
+        self.method = method
+        self.route = route
+        self.path = path
+        self.reason = reason
+        self.interval_ms = interval_ms
+        self.started_at = datetime.utcnow()
+        self.stacks: TallyCounter = TallyCounter()
+        self.sample_count = 0
+
+    def record(self, stack: Tuple[Frame, ...]) -> None:
+        self.stacks[stack] += 1
+        self.sample_count += 1
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.config = ProfilingConfig()
+        self._lock = threading.Lock()
+        self._sequence = 0
+        self._sampler: Optional[StackSampler] = None
+
+    def configure(self, update: ProfilingUpdate) -> ProfilingConfig:
+        with self._lock:
+            changes = {
+                key: value
+                for key, value in update.dict(exclude_unset=True).items()
+                if value is not None or key in ("threshold_ms", "route")
+            }
+            self.config = ProfilingConfig(**{**self.config.dict(), **changes})
+            if self._sampler is not None:
+                self._sampler.interval = self.config.interval_ms / 1000
+            return self.config
+
+    def _ensure_sampler(self) -> StackSampler:
+        with self._lock:
+            if self._sampler is None:
+                self._sampler = StackSampler(self.config.interval_ms / 1000)
+                self._sampler.start()
+            return self._sampler
+
+    @contextmanager
+    def bind_thread(self) -> Iterator[None]:
+        """Çağıran iş parçacığını etkin profil oturumuna bağlar."""
+        session = current_session.get()
+        if session is None:
+            yield
+            return
+        sampler = self._ensure_sampler()
+        thread_id = threading.get_ident()
+        sampler.attach(thread_id, session)
+        try:
+            yield
+        finally:
+            sampler.detach(thread_id)
+
+    def start(self, method: str, route: str, path: str) -> Optional[ProfileSession]:
+        with self._lock:
+            config = self.config
+            if not config.enabled:
+                return None
+            reason = None
+            if config.route and config.remaining > 0 and config.route == route:
+                config.remaining -= 1
+                reason = "route"
+            elif config.threshold_ms is not None:
+                reason = "threshold"
+            if reason is None:
+                return None
+        return ProfileSession(method, route, path, reason, config.interval_ms)
+
+    def finish(self, session: ProfileSession, status: int, duration: float) -> Optional[str]:
+        duration_ms = duration * 1000
+        threshold = self.config.threshold_ms
+        if session.reason == "threshold" and (threshold is None or duration_ms < threshold):
+            return None
+        with self._lock:
+            self._sequence += 1
+            profile_id = f"{session.started_at.strftime('%Y%m%d%H%M%S%f')}-{os.getpid()}-{self._sequence}"
+        record = {
+            "id": profile_id,
+            "method": session.method,
+            "route": session.route,
+            "path": session.path,
+            "status": status,
+            "reason": session.reason,
+            "started_at": session.started_at.isoformat(),
+            "duration_ms": round(duration_ms, 3),
+            "interval_ms": session.interval_ms,
+            "sample_count": session.sample_count,
+            "top_functions": top_functions(session.stacks, session.sample_count),
+            "stacks": {_fold(stack): count for stack, count in session.stacks.most_common()},
+        }
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        save_json_atomic(PROFILE_DIR / f"profile_{profile_id}.json", record, Durability.relaxed)
+        self._trim()
+        return profile_id
+
+    def _trim(self) -> None:
+        files = sorted(PROFILE_DIR.glob("profile_*.json"), key=lambda p: p.stat().st_mtime)
+        for path in files[: max(len(files) - self.config.max_profiles, 0)]:
+            path.unlink(missing_ok=True)
+
+
+def _frame_label(frame: Frame) -> str:
+    filename, lineno, name = frame
+    if filename.startswith(PACKAGE_DIR):
+        filename = "backend" + filename[len(PACKAGE_DIR):]
+    else:
+        filename = os.path.basename(filename)
+    return f"{name} ({filename}:{lineno})"
+
+
+def _fold(stack: Tuple[Frame, ...]) -> str:
+    return ";".join(_frame_label(frame) for frame in stack)
+
+
+def top_functions(stacks: TallyCounter, sample_count: int, limit: int = 25) -> List[Dict[str, object]]:
+    own: TallyCounter = TallyCounter()
+    total: TallyCounter = TallyCounter()
+    for stack, count in stacks.items():
+        own[stack[-1]] += count
+        for frame in set(stack):
+            total[frame] += count
+    rows = []
+    for frame, count in total.most_common(limit):
+        rows.append(
+            {
+                "function": _frame_label(frame),
+                "self_samples": own.get(frame, 0),
+                "total_samples": count,
+                "self_pct": round(100 * own.get(frame, 0) / max(sample_count, 1), 2),
+                "total_pct": round(100 * count / max(sample_count, 1), 2),
+            }
+        )
+    return rows
+
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    if not profile_id or "/" in profile_id or "\\" in profile_id or ".." in profile_id:
+        return None
+    path = PROFILE_DIR / f"profile_{profile_id}.json"
+    return path if path.exists() else None
+
+
+def list_profiles() -> List[ProfileSummary]:
+    if not PROFILE_DIR.exists():
+        return []
+    summaries = []
+    for path in sorted(PROFILE_DIR.glob("profile_*.json"), key=lambda p: p.stat().st_mtime, reverse=True):
+        data = read_json(path)
+        if data:
+            summaries.append(ProfileSummary(**data))
+    return summaries
+
+
+def load_profile(profile_id: str) -> Optional[dict]:
+    path = profile_path(profile_id)
+    return read_json(path) if path else None
+
+
+def folded_stacks(profile: dict) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in profile.get("stacks", {}).items())
+
+
+profiler = Profiler()
+
+
+def bound_to_profile(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Senkron fonksiyonu, çalıştığı iş parçacığını etkin profil oturumuna bağlayarak sarar."""
+
+    @functools.wraps(fn)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with profiler.bind_thread():
+            return fn(*args, **kwargs)
+
+    return wrapper
+
+
+def profiled_endpoint(endpoint: Callable[..., Any]) -> Callable[..., Any]:
+    # Olay döngüsü iş parçacığı tüm isteklerin eşyordamlarını çalıştırır; bağlanırsa
+    # başka isteklerin yığınları da profile karışır. Async uç noktalar yalnızca
+    # bound_to_profile ile iş parçacığı havuzuna verdikleri işi örnekletir.
+    if asyncio.iscoroutinefunction(endpoint):
+        return endpoint
+    return bound_to_profile(endpoint)
+
+
+class ProfiledRoute(APIRoute):
+    """Senkron uç noktaları çalıştıkları iş parçacığını profil oturumuna bağlayacak şekilde sarar."""
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(path, profiled_endpoint(endpoint), **kwargs)
@@ -0,0 +1,157 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+GRANULARITIES = {"hour": 13, "day": 10}
+PERSIST_INTERVAL_SECONDS = 2.0
+NO_ACTOR = "-"
+
+Counts = Dict[str, Dict[str, Dict[str, int]]]
+
+
+class EventRollups:
+    """events.ndjson için saatlik/günlük olay tipi × aktör sayaçları.
+
+    Günlükte işlenen bayt konumu rollup ile birlikte saklanır; her çağrıda
+    yalnızca bu konumdan sonraki satırlar okunur. Yan dosya kaybolursa ya
+    da günlük kısalırsa sayaçlar günlükten yeniden kurulur.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        log_path: Path,
+        load: Callable[[Path], Any],
+        save: Callable[[Path, Any], None],
+    ) -> None:
+        self.path = path
+        self.log_path = log_path
+        self._load = load
+        self._save = save
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._dirty = False
+        self._last_persist = 0.0
+        self._reset()
+
+    def _reset(self) -> None:
+        self.offset = 0
+        self.counts: Dict[str, Counts] = {name: {} for name in GRANULARITIES}
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        self._reset()
+        try:
+            data = self._load(self.path) or {}
+            offset = int(data.get("offset", 0))
+            counts = {name: data.get(name, {}) for name in GRANULARITIES}
+            if not all(isinstance(buckets, dict) for buckets in counts.values()):
+                raise ValueError("rollup bucket yapısı bozuk")
+        except (OSError, ValueError, TypeError, AttributeError):
+            # Okunamayan yan dosya yok sayılır; sayaçlar günlükten yeniden kurulur.
+            pass
+        else:
+            self.offset = offset
+            self.counts = counts
+        self._loaded = True
+
+    def _apply(self, record: Dict[str, Any]) -> None:
+        timestamp = str(record.get("timestamp", ""))
+        event = str(record.get("event", ""))
+        actor = NO_ACTOR if record.get("actor") is None else str(record["actor"])
+        for name, width in GRANULARITIES.items():
+            bucket = self.counts[name].setdefault(timestamp[:width], {})
+            actors = bucket.setdefault(event, {})
+            actors[actor] = actors.get(actor, 0) + 1
+
+    def _catch_up(self) -> None:
+        try:
+            self._read_new_lines()
+        except (TypeError, AttributeError, ValueError):
+            self._reset()
+            self._read_new_lines()
+
+    def _read_new_lines(self) -> None:
+        self._ensure_loaded()
+        try:
+            size = self.log_path.stat().st_size
+        except OSError:
+            size = 0
+        if size < self.offset:
+            self._reset()
+        if size == self.offset:
+            return
+        with self.log_path.open("rb") as handle:
+            handle.seek(self.offset)
+            chunk = handle.read(size - self.offset)
+        complete = chunk.rfind(b"\n") + 1
+        for line in chunk[:complete].splitlines():
+            if line.strip():
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(record, dict):
+                    self._apply(record)
+        self.offset += complete
+        self._dirty = True
+
+    def _persist(self, force: bool = False) -> None:
+        if not self._dirty:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_persist < PERSIST_INTERVAL_SECONDS:
+            return
+        self._save(self.path, {"offset": self.offset, **self.counts})
+        self._last_persist = now
+        self._dirty = False
+
+    def catch_up(self) -> None:
+        with self._lock:
+            self._catch_up()
+            self._persist()
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._loaded:
+                self._persist(force=True)
+
+    def rebuild(self) -> None:
+        with self._lock:
+            self._loaded = True
+            self._reset()
+            self._catch_up()
+            self._persist(force=True)
+
+    def series(
+        self,
+        granularity: str = "day",
+        event: Optional[str] = None,
+        actor: Optional[str] = None,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        group_by: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._catch_up()
+            self._persist()
+            buckets = self.counts[granularity]
+            points: List[Dict[str, Any]] = []
+            for bucket in sorted(buckets):
+                if (start and bucket < start) or (end and bucket[: len(end)] > end):
+                    continue
+                grouped: Dict[str, int] = {}
+                for event_name, actors in buckets[bucket].items():
+                    if event and event_name != event:
+                        continue
+                    for actor_name, count in actors.items():
+                        if actor and actor_name != actor:
+                            continue
+                        key = event_name if group_by == "event" else actor_name if group_by == "actor" else ""
+                        grouped[key] = grouped.get(key, 0) + count
+                for key, count in sorted(grouped.items()):
+                    points.append({"bucket": bucket, "key": key or None, "count": count})
+            return points
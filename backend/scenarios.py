@@ -0,0 +1,79 @@
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from itertools import repeat
+from typing import Any, Dict, List, Optional
+
+from .kpi import calculate_kpi_from_state
+from .models import KPI, Schedule, ScenarioResult, ScenarioSpec, ScheduleStatus
+from .scheduler import SchedulerConfig, plan_from_state
+
+MAX_WORKERS = max(min(os.cpu_count() or 1, 8), 1)
+# Çok iş parçacıklı sunucudan fork yerine temiz süreçler başlatılır.
+MP_CONTEXT = multiprocessing.get_context("spawn")
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=MP_CONTEXT)
+        return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def evaluate(spec: ScenarioSpec, snapshot: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    weights = spec.weights.dict() if spec.weights else dict(snapshot["settings"].weights)
+    state = dict(snapshot)
+    if spec.setup_matrix is not None:
+        state["setup_matrix"] = spec.setup_matrix
+    schedule = Schedule(id=0, version=0, status=ScheduleStatus.draft, created_at=now, created_by=0)
+    draft = plan_from_state(state, schedule, SchedulerConfig(weights), now)
+    kpi = calculate_kpi_from_state(draft, state)
+    return {"name": spec.name, "weights": weights, "kpi": kpi, "item_count": len(draft.items)}
+
+
+def _objectives(kpi: KPI) -> tuple:
+    return kpi.total_lateness_min, kpi.total_setup_min, kpi.change_count, -kpi.avg_utilization
+
+
+def pareto_front(results: List[Dict[str, Any]]) -> List[str]:
+    vectors = [(result["name"], _objectives(result["kpi"])) for result in results]
+    front = []
+    for name, vector in vectors:
+        dominated = any(
+            other != vector and all(o <= v for o, v in zip(other, vector)) for _, other in vectors
+        )
+        if not dominated:
+            front.append(name)
+    return front
+
+
+def run_scenarios(specs: List[ScenarioSpec], snapshot: Dict[str, Any]) -> List[ScenarioResult]:
+    now = datetime.utcnow()
+    if len(specs) == 1:
+        raw = [evaluate(specs[0], snapshot, now)]
+    else:
+        try:
+            # Parça başına tek pickle: yinelenen anlık görüntü referansı parça içinde bir kez serileşir.
+            chunksize = math.ceil(len(specs) / MAX_WORKERS)
+            raw = list(_get_pool().map(evaluate, specs, repeat(snapshot), repeat(now), chunksize=chunksize))
+        except BrokenProcessPool:
+            shutdown_pool()
+            raise
+    front = set(pareto_front(raw))
+    return [ScenarioResult(**result, pareto_optimal=result["name"] in front) for result in raw]
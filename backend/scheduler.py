@@ -1,9 +1,25 @@
+import math
 from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, Iterable, List, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
 
-from .models import Order, OrderStatus, Product, Schedule, ScheduleDraft, ScheduleItem, ScheduleStatus, WorkCenter
+from .metrics import span
+from .models import (
+    Order,
+    OrderStatus,
+    Product,
+    RoughCutBucket,
+    Schedule,
+    ScheduleConflict,
+    ScheduleDiff,
+    ScheduleDraft,
+    ScheduleItem,
+    ScheduleStatus,
+    WorkCenter,
+)
+from .shifts import AvailabilityIndex, build_availability, shift_minutes
 from .storage import load_state
+from .timeline import WorkcenterTimeline, build_timelines
 
 
 class SchedulerConfig:
@@ -14,7 +30,20 @@ class SchedulerConfig:
         self.w4 = weights.get("w4", 2)
 
 
+class RushCostConfig:
+    """Acil sipariş yerleştirme maliyet katsayıları; planlama ağırlıklarından (w1..w4) bağımsızdır."""
+
+    def __init__(self, costs: Dict[str, float]):
+        self.lateness = costs.get("lateness", 3)
+        self.setup = costs.get("setup", 5)
+        self.completion = costs.get("completion", 1)
+        self.push = costs.get("push", 2)
+
+
 def processing_time(order: Order, workcenter: WorkCenter) -> int:
+    minutes_per_shift = shift_minutes(workcenter)
+    if minutes_per_shift:
+        return max(math.ceil(order.quantity * minutes_per_shift / workcenter.capacity_per_shift), 1)
     base = 30 + order.quantity // 5
     capacity_factor = max(workcenter.capacity_per_shift, 1)
     return max(int(base * (order.quantity / capacity_factor)), 1)
@@ -24,12 +53,56 @@ def setup_time(prev_key: str, next_key: str, setup_matrix: Dict[Tuple[str, str],
     return setup_matrix.get((prev_key, next_key), 0)
 
 
+def setup_key_for(order: Order, product_lookup: Dict[str, Product]) -> str:
+    product = product_lookup.get(order.product_code)
+    return product.setup_key if product else order.product_code
+
+
+def order_sort_key(order: Order, config: SchedulerConfig) -> Tuple[bool, datetime]:
+    return not order.is_rush, order.due_date - timedelta(days=config.w3 * (order.priority - 1))
+
+
+def sequence_groups(
+    grouped: Dict[str, List[Order]],
+    previous_key: Optional[str],
+    setup_matrix: Dict[Tuple[str, str], int],
+    config: SchedulerConfig,
+    now: datetime,
+) -> List[str]:
+    remaining = set(grouped)
+    heads = {
+        key: (
+            max((orders[0].due_date - now).total_seconds() / 3600, 0),
+            sum(1 for order in orders if order.is_rush),
+        )
+        for key, orders in grouped.items()
+    }
+    sequence: List[str] = []
+    while remaining:
+        def score(key: str) -> Tuple[float, str]:
+            slack_hours, rush_count = heads[key]
+            setup_minutes = setup_time(previous_key, key, setup_matrix) if previous_key else 0
+            return config.w1 * slack_hours + config.w2 * setup_minutes - config.w4 * rush_count * 24, key
+
+        chosen = min(remaining, key=score)
+        sequence.append(chosen)
+        remaining.remove(chosen)
+        previous_key = chosen
+    return sequence
+
+
 def generate_proposal(
     orders: Iterable[Order],
     workcenters: Iterable[WorkCenter],
     setup_matrix: Dict[Tuple[str, str], int],
     schedule_base: Schedule,
     product_lookup: Dict[str, Product],
+    now: Optional[datetime] = None,
+    start_times: Optional[Dict[int, datetime]] = None,
+    previous_keys: Optional[Dict[int, str]] = None,
+    first_sequence_no: int = 1,
+    availability: Optional[Dict[int, AvailabilityIndex]] = None,
+    config: Optional[SchedulerConfig] = None,
 ) -> ScheduleDraft:
     workcenter_list = list(workcenters)
     schedule_items: List[ScheduleItem] = []
@@ -37,24 +110,26 @@ def generate_proposal(
         return ScheduleDraft(schedule=schedule_base, items=schedule_items)
     grouped: Dict[str, List[Order]] = defaultdict(list)
     for order in orders:
-        product = product_lookup.get(order.product_code)
-        key = product.setup_key if product else order.product_code
-        grouped[key].append(order)
-    now = datetime.utcnow()
+        grouped[setup_key_for(order, product_lookup)].append(order)
+    now = now or datetime.utcnow()
+    start_times = start_times or {}
+    previous_keys = previous_keys or {}
+    availability = availability or build_availability(workcenter_list, now)
+    config = config or SchedulerConfig({})
     for group_orders in grouped.values():
-        group_orders.sort(key=lambda o: (o.due_date, processing_time(o, workcenter_list[0])))
-    sequence_counter = 1
+        group_orders.sort(key=lambda o: (*order_sort_key(o, config), processing_time(o, workcenter_list[0])))
+    sequence_counter = first_sequence_no
     for wc in workcenter_list:
-        current_ts = now
-        previous_key = None
-        for setup_key, group_orders in grouped.items():
-            for order in group_orders:
-                duration = timedelta(minutes=processing_time(order, wc))
+        calendar = availability[wc.id]
+        current_ts = max(start_times.get(wc.id, now), now)
+        previous_key = previous_keys.get(wc.id)
+        for setup_key in sequence_groups(grouped, previous_key, setup_matrix, config, now):
+            for order in grouped[setup_key]:
                 setup_minutes = 0
                 if previous_key:
                     setup_minutes = setup_time(previous_key, setup_key, setup_matrix)
-                start_time = current_ts + timedelta(minutes=setup_minutes)
-                end_time = start_time + duration
+                start_time = calendar.next_free(calendar.advance(current_ts, setup_minutes))
+                end_time = calendar.advance(start_time, processing_time(order, wc))
                 item = ScheduleItem(
                     schedule_id=schedule_base.id,
                     workcenter_id=wc.id,
@@ -70,21 +145,293 @@ def generate_proposal(
     return ScheduleDraft(schedule=schedule_base, items=schedule_items)
 
 
-def run_scheduler(schedule_id: int, version: int, created_by: int) -> ScheduleDraft:
-    state = load_state()
-    weights = state["settings"].weights
-    _ = SchedulerConfig(weights)
+def frozen_items(
+    latest: dict,
+    schedule_id: int,
+    open_order_ids: Set[int],
+    now: datetime,
+    frozen_until: datetime,
+) -> List[ScheduleItem]:
+    pinned: List[ScheduleItem] = []
+    for raw in latest.get("items", []) if latest else []:
+        item = ScheduleItem(**raw)
+        if item.order_id not in open_order_ids:
+            continue
+        if item.start_ts < frozen_until and item.end_ts > now:
+            pinned.append(item.copy(update={"schedule_id": schedule_id, "frozen": True}))
+    pinned.sort(key=lambda item: (item.workcenter_id, item.start_ts))
+    return pinned
+
+
+def rough_cut(
+    orders: Iterable[Order],
+    workcenters: List[WorkCenter],
+    horizon_end: datetime,
+    bucket_days: int,
+) -> List[RoughCutBucket]:
+    if not workcenters:
+        return []
+    bucket_length = timedelta(days=bucket_days)
+    buckets: Dict[int, List[int]] = defaultdict(lambda: [0, 0, 0])
+    for order in orders:
+        index = max(int((order.due_date - horizon_end) / bucket_length), 0)
+        load = sum(processing_time(order, wc) for wc in workcenters) / len(workcenters)
+        bucket = buckets[index]
+        bucket[0] += 1
+        bucket[1] += order.quantity
+        bucket[2] += int(load)
+    return [
+        RoughCutBucket(
+            period_start=horizon_end + bucket_length * index,
+            period_end=horizon_end + bucket_length * (index + 1),
+            order_count=count,
+            quantity=quantity,
+            load_minutes=load,
+        )
+        for index, (count, quantity, load) in sorted(buckets.items())
+    ]
+
+
+def plan_from_state(
+    state: Dict[str, Any],
+    schedule: Schedule,
+    config: SchedulerConfig,
+    now: Optional[datetime] = None,
+) -> ScheduleDraft:
+    planning = state["settings"].planning
+    now = now or datetime.utcnow()
+    horizon_end = now + timedelta(days=planning.get("horizon_days", 14))
+    frozen_until = now + timedelta(minutes=planning.get("frozen_minutes", 0))
     open_orders = [o for o in state["orders"] if o.status != OrderStatus.done]
     workcenters = state["workcenters"]
     setup_matrix = {
         (row.from_key, row.to_key): row.setup_minutes for row in state["setup_matrix"]
     }
     product_lookup = {product.code: product for product in state["products"]}
+    order_lookup = {order.id: order for order in open_orders}
+    pinned = frozen_items(state["latest"], schedule.id, set(order_lookup), now, frozen_until)
+    pinned_order_ids = {item.order_id for item in pinned}
+    start_times: Dict[int, datetime] = {}
+    previous_keys: Dict[int, str] = {}
+    for item in pinned:
+        start_times[item.workcenter_id] = max(start_times.get(item.workcenter_id, now), item.end_ts)
+        previous_keys[item.workcenter_id] = setup_key_for(order_lookup[item.order_id], product_lookup)
+    in_horizon: List[Order] = []
+    beyond_horizon: List[Order] = []
+    for order in open_orders:
+        if order.id in pinned_order_ids:
+            continue
+        if order.is_rush or order.due_date <= horizon_end:
+            in_horizon.append(order)
+        else:
+            beyond_horizon.append(order)
+    draft = generate_proposal(
+        in_horizon,
+        workcenters,
+        setup_matrix,
+        schedule,
+        product_lookup,
+        now=now,
+        start_times=start_times,
+        previous_keys=previous_keys,
+        first_sequence_no=len(pinned) + 1,
+        availability=build_availability(workcenters, now),
+        config=config,
+    )
+    for sequence_no, item in enumerate(pinned, start=1):
+        item.sequence_no = sequence_no
+    draft.items = pinned + draft.items
+    draft.rough_cut = rough_cut(beyond_horizon, workcenters, horizon_end, planning.get("rough_cut_bucket_days", 7))
+    return draft
+
+
+def run_scheduler(schedule_id: int, version: int, created_by: int) -> ScheduleDraft:
+    state = load_state()
+    config = SchedulerConfig(state["settings"].weights)
+    now = datetime.utcnow()
     schedule = Schedule(
         id=schedule_id,
         version=version,
         status=ScheduleStatus.draft,
-        created_at=datetime.utcnow(),
+        created_at=now,
         created_by=created_by,
     )
-    return generate_proposal(open_orders, workcenters, setup_matrix, schedule, product_lookup)
+    with span("scheduler.generate_proposal"):
+        return plan_from_state(state, schedule, config, now)
+
+
+class RushSlot:
+    def __init__(self, workcenter_id: int, index: int, start: datetime, end: datetime, cost: float):
+        self.workcenter_id = workcenter_id
+        self.index = index
+        self.start = start
+        self.end = end
+        self.cost = cost
+
+
+def _minutes(delta: timedelta) -> float:
+    return delta.total_seconds() / 60
+
+
+def find_rush_slot(
+    order: Order,
+    timelines: Dict[int, WorkcenterTimeline],
+    workcenters: Iterable[WorkCenter],
+    setup_matrix: Dict[Tuple[str, str], int],
+    item_keys: Dict[int, Optional[str]],
+    rush_key: str,
+    costs: RushCostConfig,
+    now: datetime,
+    availability: Dict[int, AvailabilityIndex],
+    frozen_until: Optional[datetime] = None,
+) -> Optional[RushSlot]:
+    best: Optional[RushSlot] = None
+    frozen_until = max(frozen_until or now, now)
+    for wc in workcenters:
+        calendar = availability[wc.id]
+        timeline = timelines.get(wc.id) or WorkcenterTimeline(wc.id, [])
+        items = timeline.items
+        duration = processing_time(order, wc)
+        running = timeline.item_at(now)
+        first = max(
+            timeline.first_index_at_or_after(running.end_ts if running else now),
+            timeline.first_index_at_or_after(frozen_until),
+        )
+        for index in range(first, len(items) + 1):
+            previous = items[index - 1] if index > 0 else None
+            following = items[index] if index < len(items) else None
+            ready = calendar.next_free(max(previous.end_ts, now) if previous else now)
+            earliest_end = calendar.advance(ready, duration)
+            lower_bound = costs.lateness * max(_minutes(earliest_end - order.due_date), 0) + costs.completion * _minutes(
+                earliest_end - now
+            )
+            if best and lower_bound >= best.cost:
+                break
+            previous_key = item_keys.get(previous.order_id) if previous else None
+            following_key = item_keys.get(following.order_id) if following else None
+            setup_before = setup_time(previous_key, rush_key, setup_matrix) if previous_key else 0
+            setup_after = setup_time(rush_key, following_key, setup_matrix) if following_key else 0
+            removed_setup = (
+                setup_time(previous_key, following_key, setup_matrix) if previous_key and following_key else 0
+            )
+            start = calendar.next_free(calendar.advance(ready, setup_before))
+            end = calendar.advance(start, duration)
+            push = 0.0
+            if following:
+                push = max(_minutes(calendar.advance(end, setup_after) - following.start_ts), 0)
+            cost = (
+                costs.lateness * max(_minutes(end - order.due_date), 0)
+                + costs.completion * _minutes(end - now)
+                + costs.setup * (setup_before + setup_after - removed_setup)
+                + costs.push * push
+            )
+            if best is None or cost < best.cost:
+                best = RushSlot(wc.id, index, start, end, cost)
+    return best
+
+
+def insert_rush_order(
+    base: ScheduleDraft,
+    order: Order,
+    schedule: Schedule,
+    workcenters: List[WorkCenter],
+    setup_matrix: Dict[Tuple[str, str], int],
+    product_lookup: Dict[str, Product],
+    order_lookup: Dict[int, Order],
+    costs: RushCostConfig,
+    now: Optional[datetime] = None,
+    frozen_minutes: int = 0,
+) -> Optional[Tuple[ScheduleDraft, ScheduleDiff]]:
+    now = now or datetime.utcnow()
+    frozen_until = now + timedelta(minutes=frozen_minutes)
+    timelines = build_timelines(base.items)
+    item_keys = {
+        order_id: setup_key_for(known, product_lookup) for order_id, known in order_lookup.items()
+    }
+    rush_key = setup_key_for(order, product_lookup)
+    availability = build_availability(workcenters, now)
+    slot = find_rush_slot(
+        order, timelines, workcenters, setup_matrix, item_keys, rush_key, costs, now, availability, frozen_until
+    )
+    if slot is None:
+        return None
+    new_item = ScheduleItem(
+        schedule_id=schedule.id,
+        workcenter_id=slot.workcenter_id,
+        order_id=order.id,
+        start_ts=slot.start,
+        end_ts=slot.end,
+        sequence_no=max((item.sequence_no for item in base.items), default=0) + 1,
+    )
+    moved: Dict[Tuple[int, int, int], ScheduleItem] = {}
+    timeline = timelines.get(slot.workcenter_id)
+    previous_end, previous_key = slot.end, rush_key
+    calendar = availability[slot.workcenter_id]
+    for item in timeline.items[slot.index:] if timeline else []:
+        item_key = item_keys.get(item.order_id)
+        setup_minutes = setup_time(previous_key, item_key, setup_matrix) if item_key else 0
+        required = calendar.next_free(calendar.advance(previous_end, setup_minutes))
+        if item.start_ts >= required:
+            break
+        work_minutes = calendar.available_minutes(item.start_ts, item.end_ts)
+        shifted = item.copy(
+            update={
+                "schedule_id": schedule.id,
+                "start_ts": required,
+                "end_ts": calendar.advance(required, work_minutes),
+            }
+        )
+        moved[(item.workcenter_id, item.order_id, item.sequence_no)] = shifted
+        previous_end, previous_key = shifted.end_ts, item_key
+    items = []
+    for item in base.items:
+        replacement = moved.get((item.workcenter_id, item.order_id, item.sequence_no))
+        items.append(replacement or item.copy(update={"schedule_id": schedule.id}))
+    items.append(new_item)
+    draft = ScheduleDraft(schedule=schedule, items=items, rough_cut=base.rough_cut)
+    diff = ScheduleDiff(
+        schedule_id=schedule.id,
+        base_version=base.schedule.version,
+        version=schedule.version,
+        added=[new_item],
+        moved=list(moved.values()),
+    )
+    return draft, diff
+
+
+def find_conflicts(
+    items: Iterable[ScheduleItem],
+    workcenters: Iterable[WorkCenter],
+    now: Optional[datetime] = None,
+) -> List[ScheduleConflict]:
+    timelines = build_timelines(items)
+    workcenter_lookup = {wc.id: wc for wc in workcenters}
+    origin = min((t.items[0].start_ts for t in timelines.values() if t.items), default=now or datetime.utcnow())
+    conflicts: List[ScheduleConflict] = []
+    for workcenter_id, timeline in timelines.items():
+        wc = workcenter_lookup.get(workcenter_id)
+        if wc is None:
+            conflicts.extend(
+                ScheduleConflict(workcenter_id=workcenter_id, order_id=item.order_id, reason="unknown_workcenter")
+                for item in timeline.items
+            )
+            continue
+        calendar = AvailabilityIndex(wc, origin)
+        latest: Optional[ScheduleItem] = None
+        for item in timeline.items:
+            if latest and item.start_ts < latest.end_ts:
+                conflicts.append(
+                    ScheduleConflict(
+                        workcenter_id=workcenter_id,
+                        order_id=item.order_id,
+                        other_order_id=latest.order_id,
+                        reason="overlap",
+                    )
+                )
+            if not item.frozen and not calendar.is_available(item.start_ts):
+                conflicts.append(
+                    ScheduleConflict(workcenter_id=workcenter_id, order_id=item.order_id, reason="unavailable")
+                )
+            if latest is None or item.end_ts > latest.end_ts:
+                latest = item
+    return conflicts
@@ -6,7 +6,7 @@ from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 
 from .models import Role, TokenResponse, User
-from .storage import load_state
+from .storage import load_users
 
 SECRET_KEY = "super-secret-key"
 ALGORITHM = "HS256"
@@ -26,8 +26,7 @@ def verify_password(password: str, password_hash: str) -> bool:
 
 
 def authenticate_user(email: str, password: str) -> Optional[User]:
-    state = load_state()
-    for user in state["users"]:
+    for user in load_users():
         if user.email.lower() == email.lower() and verify_password(password, user.password_hash):
             return user
     return None
@@ -45,8 +44,7 @@ def create_access_token(user: User) -> str:
 
 
 def get_user(user_id: int) -> Optional[User]:
-    state = load_state()
-    for user in state["users"]:
+    for user in load_users():
         if user.id == user_id:
             return user
     return None
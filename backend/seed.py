@@ -6,12 +6,12 @@ from datetime import datetime, timedelta
 
 from .models import Order, OrderStatus, Product, Role, SetupMatrixRow, User, WorkCenter
 from .security import hash_password
+from .sequence import sequences
 from .storage import (
     ensure_files,
     load_state,
     save_orders,
     save_products,
-    save_settings,
     save_setup_matrix,
     save_users,
     save_workcenters,
@@ -54,7 +54,8 @@ def run(seed_orders: bool = True) -> None:
         ]
         save_setup_matrix(matrix)
 
-    if seed_orders and not state["orders"]:
+    orders = state["orders"]
+    if seed_orders and not orders:
         now = datetime.utcnow()
         orders = [
             Order(
@@ -71,10 +72,7 @@ def run(seed_orders: bool = True) -> None:
         ]
         save_orders(orders)
 
-    settings = state["settings"]
-    settings.counters.setdefault("orders", len(state["orders"]) or 5)
-    settings.counters.setdefault("schedule", 0)
-    save_settings(settings)
+    sequences.ensure_at_least("orders", max((order.id for order in orders), default=0))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,68 @@
+import threading
+from pathlib import Path
+from typing import Dict, Tuple
+
+from filelock import FileLock
+
+from .storage import DATA_DIR, DATA_FILES, Durability, read_json, save_json_atomic
+
+SEQUENCE_DIR = DATA_DIR / "sequences"
+SEQUENCE_LOCK = DATA_DIR / ".sequence.lock"
+DEFAULT_BLOCK_SIZE = 20
+
+
+class SequenceStore:
+    """Süreç başına id blokları ayıran sayaç deposu.
+
+    Diskte yalnızca her sıranın en yüksek ayrılmış değeri tutulur; blok
+    ayrılmadan önce yazıldığı için çökme sonrası id tekrar kullanılmaz,
+    kullanılmayan blok artığı boşluk olarak kalır.
+    """
+
+    def __init__(self, directory: Path, block_size: int = DEFAULT_BLOCK_SIZE) -> None:
+        self.directory = directory
+        self.block_size = max(block_size, 1)
+        self._blocks: Dict[str, Tuple[int, int]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, name: str) -> Path:
+        return self.directory / f"{name}.json"
+
+    def _read_high_water(self, name: str) -> int:
+        data = read_json(self._path(name))
+        if data is not None:
+            return int(data.get("high_water", 0))
+        settings = read_json(DATA_FILES["settings"]) or {}
+        return int(settings.get("counters", {}).get(name, 0))
+
+    def _write_high_water(self, name: str, value: int) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Sıra dosyası her zaman fsync edilir; kaybolan bir üst sınır id tekrarına yol açar.
+        save_json_atomic(self._path(name), {"high_water": value}, Durability.strict)
+
+    def _reserve(self, name: str, size: int) -> Tuple[int, int]:
+        with FileLock(str(SEQUENCE_LOCK)):
+            high_water = self._read_high_water(name)
+            self._write_high_water(name, high_water + size)
+        return high_water + 1, high_water + size
+
+    def next_id(self, name: str) -> int:
+        with self._lock:
+            current, limit = self._blocks.get(name, (1, 0))
+            if current > limit:
+                current, limit = self._reserve(name, self.block_size)
+            self._blocks[name] = (current + 1, limit)
+            return current
+
+    def ensure_at_least(self, name: str, value: int) -> None:
+        with self._lock, FileLock(str(SEQUENCE_LOCK)):
+            if self._read_high_water(name) < value:
+                self._write_high_water(name, value)
+            self._blocks.pop(name, None)
+
+
+sequences = SequenceStore(SEQUENCE_DIR)
+
+
+def next_id(name: str) -> int:
+    return sequences.next_id(name)
@@ -0,0 +1,166 @@
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import ShiftWindow, WorkCenter
+
+DEFAULT_WINDOW_DAYS = 28
+MAX_WINDOW_DAYS = 3660
+REFERENCE_DAY = datetime(2000, 1, 3)
+
+Interval = Tuple[datetime, datetime]
+
+
+def _minutes(delta: timedelta) -> float:
+    return delta.total_seconds() / 60
+
+
+def _subtract(intervals: List[Interval], holes: List[Interval]) -> List[Interval]:
+    result: List[Interval] = []
+    for start, end in intervals:
+        pieces = [(start, end)]
+        for hole_start, hole_end in holes:
+            next_pieces = []
+            for piece_start, piece_end in pieces:
+                if hole_end <= piece_start or hole_start >= piece_end:
+                    next_pieces.append((piece_start, piece_end))
+                    continue
+                if hole_start > piece_start:
+                    next_pieces.append((piece_start, hole_start))
+                if hole_end < piece_end:
+                    next_pieces.append((hole_end, piece_end))
+            pieces = next_pieces
+        result.extend(pieces)
+    return result
+
+
+def _merge(intervals: Iterable[Interval]) -> List[Interval]:
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def shift_intervals(day: datetime, shift: ShiftWindow) -> List[Interval]:
+    start = datetime.combine(day.date(), shift.start)
+    end = datetime.combine(day.date(), shift.end)
+    if end <= start:
+        end += timedelta(days=1)
+    breaks: List[Interval] = []
+    for window in shift.breaks:
+        break_start = datetime.combine(day.date(), window.start)
+        if break_start < start:
+            break_start += timedelta(days=1)
+        break_end = datetime.combine(break_start.date(), window.end)
+        if break_end <= break_start:
+            break_end += timedelta(days=1)
+        breaks.append((break_start, break_end))
+    return _subtract([(start, end)], sorted(breaks))
+
+
+def shift_minutes(workcenter: WorkCenter) -> Optional[float]:
+    """Molalar düşülmüş ortalama vardiya süresi (dakika)."""
+    if not workcenter.shifts:
+        return None
+    lengths = [
+        sum(_minutes(end - start) for start, end in shift_intervals(REFERENCE_DAY, shift)) for shift in workcenter.shifts
+    ]
+    return sum(lengths) / len(lengths)
+
+
+class AvailabilityIndex:
+    """Bir hattın vardiya takviminden üretilmiş, sıralı müsaitlik aralıkları.
+
+    Aralık başlangıçları ve kümülatif müsait dakikalar üzerinde ikili arama
+    yapıldığı için sonraki boş an, iş bitiş zamanı ve aralıktaki müsait süre
+    sorguları O(log n) çalışır. Takvimi olmayan hat kesintisiz kabul edilir.
+    """
+
+    def __init__(self, workcenter: WorkCenter, origin: datetime, days: int = DEFAULT_WINDOW_DAYS) -> None:
+        self.workcenter = workcenter
+        self.continuous = not workcenter.shifts
+        self.origin = datetime.combine(origin.date(), datetime.min.time()) - timedelta(days=1)
+        self._build(days)
+
+    def _build(self, days: int) -> None:
+        self.days = days
+        self.until = self.origin + timedelta(days=days)
+        self.intervals: List[Interval] = []
+        if self.continuous:
+            self.intervals = _subtract([(self.origin, self.until)], self._downtimes())
+        else:
+            raw: List[Interval] = []
+            for offset in range(-1, days):
+                day = self.origin + timedelta(days=offset)
+                for shift in self.workcenter.shifts:
+                    if day.weekday() not in shift.weekdays:
+                        continue
+                    raw.extend(shift_intervals(day, shift))
+            self.intervals = _subtract(_merge(raw), self._downtimes())
+        self.intervals = [(max(s, self.origin), min(e, self.until)) for s, e in self.intervals if e > self.origin and s < self.until]
+        self.starts = [start for start, _ in self.intervals]
+        self.ends = [end for _, end in self.intervals]
+        self.cumulative: List[float] = []
+        total = 0.0
+        for start, end in self.intervals:
+            self.cumulative.append(total)
+            total += _minutes(end - start)
+        self.total = total
+
+    def _downtimes(self) -> List[Interval]:
+        return sorted((d.start, d.end) for d in self.workcenter.downtimes if d.end > d.start)
+
+    def _ensure(self, ts: datetime) -> None:
+        while ts >= self.until and self.days < MAX_WINDOW_DAYS:
+            self._build(min(self.days * 2, MAX_WINDOW_DAYS))
+
+    def _available_before(self, ts: datetime) -> float:
+        index = bisect_right(self.starts, ts) - 1
+        if index < 0:
+            return 0.0
+        start, end = self.intervals[index]
+        return self.cumulative[index] + _minutes(min(ts, end) - start)
+
+    def next_free(self, ts: datetime) -> datetime:
+        self._ensure(ts)
+        index = bisect_right(self.starts, ts) - 1
+        if index >= 0 and ts < self.ends[index]:
+            return ts
+        if index + 1 < len(self.intervals):
+            return self.intervals[index + 1][0]
+        if self.days >= MAX_WINDOW_DAYS:
+            return ts
+        self._build(min(self.days * 2, MAX_WINDOW_DAYS))
+        return self.next_free(ts)
+
+    def advance(self, ts: datetime, minutes: float) -> datetime:
+        start = self.next_free(ts)
+        if minutes <= 0:
+            return start
+        target = self._available_before(start) + minutes
+        while target > self.total and self.days < MAX_WINDOW_DAYS:
+            self._build(min(self.days * 2, MAX_WINDOW_DAYS))
+        if target > self.total:
+            return self.until + timedelta(minutes=target - self.total)
+        index = bisect_left(self.cumulative, target) - 1
+        return self.intervals[index][0] + timedelta(minutes=target - self.cumulative[index])
+
+    def available_minutes(self, start: datetime, end: datetime) -> float:
+        if end <= start:
+            return 0.0
+        self._ensure(end)
+        return self._available_before(end) - self._available_before(start)
+
+    def is_available(self, ts: datetime) -> bool:
+        self._ensure(ts)
+        index = bisect_right(self.starts, ts) - 1
+        return index >= 0 and ts < self.ends[index]
+
+
+def build_availability(workcenters: Iterable[WorkCenter], origin: datetime) -> Dict[int, AvailabilityIndex]:
+    return {wc.id: AvailabilityIndex(wc, origin) for wc in workcenters}
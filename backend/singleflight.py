@@ -0,0 +1,50 @@
+import asyncio
+import json
+from typing import Any, Callable, Dict, Hashable
+
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+
+from .metrics import SINGLEFLIGHT_CALLS
+
+
+def encode_json(obj: Any) -> bytes:
+    return json.dumps(jsonable_encoder(obj), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class SingleFlight:
+    """Aynı anahtarlı eşzamanlı çağrıları tek hesaplamada birleştirir.
+
+    Hesaplama çağıranlardan bağımsız bir görevde, iş parçacığı havuzunda
+    çalışır; her çağıran bu görevi shield ile bekler. Böylece ilk çağıranın
+    iptali yalnızca onu etkiler. Sonuç (veya hata) bekleyen herkesle
+    paylaşılır; görev bitince anahtar silinir, sonuç önbelleğe alınmaz.
+    """
+
+    def __init__(self) -> None:
+        self.enabled = True
+        self._calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    def _forget(self, key: Hashable, task: "asyncio.Future[Any]") -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        route = str(key[0]) if isinstance(key, tuple) else str(key)
+        if not self.enabled:
+            SINGLEFLIGHT_CALLS.inc(route=route, result="bypass")
+            return await run_in_threadpool(fn)
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(run_in_threadpool(fn))
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            SINGLEFLIGHT_CALLS.inc(route=route, result="leader")
+        else:
+            SINGLEFLIGHT_CALLS.inc(route=route, result="shared")
+        return await asyncio.shield(task)
+
+
+coalescer = SingleFlight()
@@ -1,15 +1,25 @@
+import atexit
+import gzip
 import json
+import logging
 import os
+import shutil
+import threading
 from contextlib import contextmanager
 from datetime import datetime
+from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from filelock import FileLock
 
+from .metrics import EVENT_LOG_BYTES, ORDER_COUNT, SCHEDULE_ITEMS, span
+from .rollups import EventRollups
+from .views import materialize
 from .models import (
     Order,
     Product,
+    RoughCutBucket,
     Schedule,
     ScheduleDraft,
     ScheduleItem,
@@ -19,10 +29,14 @@ from .models import (
     WorkCenter,
 )
 
-DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(os.environ.get("TEKIZ_DATA_DIR") or Path(__file__).resolve().parent.parent / "data")
 SCHEDULE_DIR = DATA_DIR / "schedules"
 EVENT_LOG = DATA_DIR / "events.ndjson"
+EVENT_ROLLUPS = DATA_DIR / "events.rollup.json"
 WRITE_LOCK = DATA_DIR / ".write.lock"
+VIEW_LOCK = FileLock(str(DATA_DIR / ".views.lock"))
 
 DATA_FILES = {
     "users": DATA_DIR / "users.json",
@@ -35,6 +49,7 @@ DATA_FILES = {
 
 DRAFT_FILE = SCHEDULE_DIR / "draft.json"
 LATEST_FILE = SCHEDULE_DIR / "latest.json"
+CURRENT_FILE = SCHEDULE_DIR / "current.json"
 
 
 def ensure_files() -> None:
@@ -43,7 +58,7 @@ def ensure_files() -> None:
     for name, path in DATA_FILES.items():
         if not path.exists():
             if name == "settings":
-                path.write_text(json.dumps(Settings().dict(), ensure_ascii=False, indent=2), encoding="utf-8")
+                path.write_text(json.dumps(Settings().dict(), ensure_ascii=False, separators=COMPACT_SEPARATORS), encoding="utf-8")
             else:
                 path.write_text("[]", encoding="utf-8")
     if not EVENT_LOG.exists():
@@ -54,39 +69,196 @@ def ensure_files() -> None:
         LATEST_FILE.write_text(json.dumps({}), encoding="utf-8")
 
 
+class Durability(str, Enum):
+    strict = "strict"
+    batched = "batched"
+    relaxed = "relaxed"
+
+
+BATCH_WINDOW_SECONDS = float(os.environ.get("TEKIZ_BATCH_WINDOW", "0.5"))
+VIEW_HISTORY = int(os.environ.get("TEKIZ_VIEW_HISTORY", "3"))
+COMPACT_SEPARATORS = (",", ":")
+
+# Anahtarlar DATA_DIR'e göre göreli yollardır (ör. "schedules/draft.json").
+DURABILITY_POLICIES: Dict[str, Durability] = {
+    "schedules/draft.json": Durability.relaxed,
+}
+
+
+def _parse_policy_overrides(raw: str) -> Dict[str, Durability]:
+    overrides = {}
+    for entry in raw.split(","):
+        if "=" in entry:
+            name, mode = entry.split("=", 1)
+            overrides[name.strip()] = Durability(mode.strip())
+    return overrides
+
+
+DURABILITY_POLICIES.update(_parse_policy_overrides(os.environ.get("TEKIZ_DURABILITY", "")))
+
+
+def durability_for(path: Path) -> Durability:
+    try:
+        key = path.relative_to(DATA_DIR).as_posix()
+    except ValueError:
+        return Durability.strict
+    return DURABILITY_POLICIES.get(key, Durability.strict)
+
+
+def _fsync_directory(directory: Path) -> None:
+    fd = os.open(str(directory), os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _replace_file(path: Path, payload: Union[str, bytes], fsync: bool, target: str) -> None:
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    with tmp_path.open("wb") as tmp:
+        tmp.write(payload)
+        if fsync:
+            tmp.flush()
+            with span("storage.fsync", target):
+                os.fsync(tmp.fileno())
+    os.replace(tmp_path, path)
+
+
+class BatchedWriter:
+    def __init__(self, window: float) -> None:
+        self.window = window
+        self._pending: Dict[Path, str] = {}
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def write(self, path: Path, payload: str) -> None:
+        with self._lock:
+            self._pending[path] = payload
+            if self._timer is None:
+                self._timer = threading.Timer(self.window, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def pending(self, path: Path) -> Optional[str]:
+        with self._lock:
+            return self._pending.get(path)
+
+    def flush(self) -> None:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            directories = set()
+            for path, payload in pending.items():
+                target = _span_target(path)
+                _replace_file(path, payload, True, target)
+                directories.add(path.parent)
+            for directory in directories:
+                with span("storage.fsync", "directory"):
+                    _fsync_directory(directory)
+
+
+batched_writer = BatchedWriter(BATCH_WINDOW_SECONDS)
+
+
+def flush_pending_writes() -> None:
+    event_rollups.flush()
+    batched_writer.flush()
+
+
+atexit.register(flush_pending_writes)
+
+
 def read_json(path: Path) -> Any:
-    if not path.exists():
-        return None
-    content = path.read_text(encoding="utf-8")
+    content = batched_writer.pending(path)
+    if content is None:
+        if not path.exists():
+            return None
+        content = path.read_text(encoding="utf-8")
     if not content.strip():
         return None
     return json.loads(content)
 
 
-def save_json_atomic(path: Path, obj: Any) -> None:
-    tmp_path = path.with_suffix(path.suffix + ".tmp")
-    with tmp_path.open("w", encoding="utf-8") as tmp:
-        json.dump(obj, tmp, ensure_ascii=False, indent=2, default=str)
-        tmp.flush()
-        os.fsync(tmp.fileno())
-    os.replace(tmp_path, path)
+def _span_target(path: Path) -> str:
+    if path.name.startswith("schedule_"):
+        return "schedule_version"
+    if path.name.startswith("profile_"):
+        return "profile"
+    if path.parent.name.startswith("views_"):
+        return "view"
+    if path.name.startswith("orders-"):
+        return "archive"
+    return path.name
+
+
+def save_json_atomic(path: Path, obj: Any, durability: Optional[Durability] = None) -> None:
+    mode = durability or durability_for(path)
+    target = _span_target(path)
+    with span("storage.serialize", target):
+        payload = json.dumps(obj, ensure_ascii=False, separators=COMPACT_SEPARATORS, default=str)
+    if mode == Durability.batched:
+        batched_writer.write(path, payload)
+        return
+    if batched_writer.pending(path) is not None:
+        batched_writer.flush()
+    _replace_file(path, payload, mode == Durability.strict, target)
+    if mode == Durability.strict:
+        with span("storage.fsync", "directory"):
+            _fsync_directory(path.parent)
+
+
+def save_gzip_json_atomic(path: Path, obj: Any) -> None:
+    target = _span_target(path)
+    with span("storage.serialize", target):
+        payload = gzip.compress(
+            json.dumps(obj, ensure_ascii=False, separators=COMPACT_SEPARATORS, default=str).encode("utf-8"),
+            mtime=0,
+        )
+    _replace_file(path, payload, True, target)
+    with span("storage.fsync", "directory"):
+        _fsync_directory(path.parent)
+
+
+def read_gzip_json(path: Path) -> Any:
+    if not path.exists():
+        return None
+    with gzip.open(path, "rt", encoding="utf-8") as handle:
+        return json.load(handle)
 
 
-def write_json(path: Path, obj: Any) -> None:
-    save_json_atomic(path, obj)
+def write_json(path: Path, obj: Any, durability: Optional[Durability] = None) -> None:
+    save_json_atomic(path, obj, durability)
+
+
+def _load_models(name: str, model: Any) -> List[Any]:
+    with span("storage.load_state", name):
+        return [model(**row) for row in read_json(DATA_FILES[name]) or []]
+
+
+def load_users() -> List[User]:
+    ensure_files()
+    return _load_models("users", User)
 
 
 def load_state() -> Dict[str, Any]:
     ensure_files()
-    users = [User(**u) for u in read_json(DATA_FILES["users"]) or []]
-    products = [Product(**p) for p in read_json(DATA_FILES["products"]) or []]
-    workcenters = [WorkCenter(**w) for w in read_json(DATA_FILES["workcenters"]) or []]
-    setup_matrix = [SetupMatrixRow(**row) for row in read_json(DATA_FILES["setup_matrix"]) or []]
-    orders = [Order(**o) for o in read_json(DATA_FILES["orders"]) or []]
-    settings_data = read_json(DATA_FILES["settings"])
-    settings = Settings(**settings_data) if settings_data else Settings()
-    draft_data = read_json(DRAFT_FILE) or {}
-    latest_data = read_json(LATEST_FILE) or {}
+    users = _load_models("users", User)
+    products = _load_models("products", Product)
+    workcenters = _load_models("workcenters", WorkCenter)
+    setup_matrix = _load_models("setup_matrix", SetupMatrixRow)
+    orders = _load_models("orders", Order)
+    ORDER_COUNT.set(len(orders))
+    with span("storage.load_state", "settings"):
+        settings_data = read_json(DATA_FILES["settings"])
+        settings = Settings(**settings_data) if settings_data else Settings()
+    with span("storage.load_state", "draft"):
+        draft_data = read_json(DRAFT_FILE) or {}
+    with span("storage.load_state", "latest"):
+        latest_data = read_json(LATEST_FILE) or {}
     return {
         "users": users,
         "products": products,
@@ -112,6 +284,27 @@ def append_event(event: Dict[str, Any]) -> None:
     event_record = {**event, "timestamp": datetime.utcnow().isoformat()}
     with EVENT_LOG.open("a", encoding="utf-8") as handle:
         handle.write(json.dumps(event_record, ensure_ascii=False) + "\n")
+    try:
+        event_rollups.catch_up()
+    except Exception:
+        logger.exception("Olay rollup güncellenemedi")
+
+
+def event_log_size() -> int:
+    try:
+        return EVENT_LOG.stat().st_size
+    except OSError:
+        return 0
+
+
+EVENT_LOG_BYTES.set_function(event_log_size)
+
+event_rollups = EventRollups(
+    EVENT_ROLLUPS,
+    EVENT_LOG,
+    load=read_json,
+    save=lambda path, obj: save_json_atomic(path, obj, Durability.relaxed),
+)
 
 
 def read_events(limit: Optional[int] = None) -> List[Dict[str, Any]]:
@@ -127,7 +320,9 @@ def read_events(limit: Optional[int] = None) -> List[Dict[str, Any]]:
 
 
 def save_orders(orders: Iterable[Order]) -> None:
-    write_json(DATA_FILES["orders"], [o.dict() for o in orders])
+    rows = [o.dict() for o in orders]
+    write_json(DATA_FILES["orders"], rows)
+    ORDER_COUNT.set(len(rows))
 
 
 def save_users(users: Iterable[User]) -> None:
@@ -150,6 +345,14 @@ def save_products(products: Iterable[Product]) -> None:
     write_json(DATA_FILES["products"], [p.dict() for p in products])
 
 
+def draft_from_data(data: Dict[str, Any]) -> ScheduleDraft:
+    return ScheduleDraft(
+        schedule=Schedule(**data["schedule"]),
+        items=[ScheduleItem(**item) for item in data.get("items", [])],
+        rough_cut=[RoughCutBucket(**bucket) for bucket in data.get("rough_cut", [])],
+    )
+
+
 def save_draft(draft: ScheduleDraft) -> None:
     write_json(DRAFT_FILE, draft.dict())
 
@@ -158,28 +361,16 @@ def load_draft() -> Optional[ScheduleDraft]:
     data = read_json(DRAFT_FILE)
     if not data:
         return None
-    return ScheduleDraft(
-        schedule=Schedule(**data["schedule"]),
-        items=[ScheduleItem(**item) for item in data.get("items", [])],
-    )
+    return draft_from_data(data)
 
 
 def load_latest_schedule() -> Optional[ScheduleDraft]:
-    data = read_json(LATEST_FILE)
+    with span("storage.load_latest_schedule"):
+        data = read_json(LATEST_FILE)
     if not data:
         return None
-    return ScheduleDraft(
-        schedule=Schedule(**data["schedule"]),
-        items=[ScheduleItem(**item) for item in data.get("items", [])],
-    )
-
-
-def next_id(settings: Settings, seq_name: str) -> Tuple[int, Settings]:
-    counters = dict(settings.counters)
-    counters.setdefault(seq_name, 0)
-    counters[seq_name] += 1
-    settings.counters = counters
-    return counters[seq_name], settings
+    SCHEDULE_ITEMS.set(len(data.get("items", [])))
+    return draft_from_data(data)
 
 
 def publish_schedule(draft: ScheduleDraft) -> ScheduleDraft:
@@ -188,6 +379,9 @@ def publish_schedule(draft: ScheduleDraft) -> ScheduleDraft:
     schedule_path = SCHEDULE_DIR / f"schedule_{version}.json"
     write_json(schedule_path, draft.dict())
     write_json(LATEST_FILE, draft.dict())
+    save_views(draft.dict())
+    set_current_version(version, draft.schedule.id)
+    SCHEDULE_ITEMS.set(len(draft.items))
     append_event(
         {
             "actor": draft.schedule.created_by,
@@ -198,6 +392,95 @@ def publish_schedule(draft: ScheduleDraft) -> ScheduleDraft:
     return draft
 
 
+def view_dir(version: int) -> Path:
+    return SCHEDULE_DIR / f"views_{version}"
+
+
+def save_views(data: Dict[str, Any]) -> None:
+    version = data["schedule"]["version"]
+    with span("storage.save_views"), VIEW_LOCK:
+        views = materialize(data)
+        directory = view_dir(version)
+        directory.mkdir(parents=True, exist_ok=True)
+        files = []
+        for workcenter_id, items in views["queues"].items():
+            files.append(f"workcenter_{workcenter_id}.json")
+            write_json(directory / files[-1], items, Durability.relaxed)
+        for shard, entries in views["orders"].items():
+            files.append(f"orders_{shard}.json")
+            write_json(directory / files[-1], entries, Durability.relaxed)
+        files.append("daily_load.json")
+        write_json(directory / "daily_load.json", views["daily_load"], Durability.relaxed)
+        write_json(directory / "meta.json", {**views["meta"], "files": sorted(files)}, Durability.relaxed)
+
+
+def prune_views(current: int, history: int = VIEW_HISTORY) -> None:
+    """Güncel sürüm ve en yeni `history` sürüm dışındaki görünüm dizinlerini siler."""
+    versions = sorted(
+        (int(path.name.split("_", 1)[1]) for path in SCHEDULE_DIR.glob("views_*") if path.name.split("_", 1)[1].isdigit()),
+        reverse=True,
+    )
+    keep = {current, *versions[: max(history, 0)]}
+    for version in versions:
+        if version in keep:
+            continue
+        directory = view_dir(version)
+        (directory / "meta.json").unlink(missing_ok=True)
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+def set_current_version(version: int, schedule_id: int) -> None:
+    with VIEW_LOCK:
+        write_json(CURRENT_FILE, {"version": version, "schedule_id": schedule_id})
+        prune_views(version)
+
+
+def current_version() -> Optional[Dict[str, int]]:
+    pointer = read_json(CURRENT_FILE)
+    if pointer:
+        return pointer
+    with VIEW_LOCK:
+        pointer = read_json(CURRENT_FILE)
+        if pointer:
+            return pointer
+        data = read_json(LATEST_FILE)
+        if not data:
+            return None
+        save_views(data)
+        set_current_version(data["schedule"]["version"], data["schedule"]["id"])
+        return read_json(CURRENT_FILE)
+
+
+def _read_view(directory: Path, name: str) -> Tuple[bool, Any]:
+    """(geçerli mi, içerik); eksik, boş veya okunamayan görünüm geçersiz sayılır."""
+    try:
+        meta = read_json(directory / "meta.json")
+        if not meta or "files" not in meta:
+            return False, None
+        if name not in meta["files"]:
+            return True, None
+        content = read_json(directory / name)
+    except ValueError:
+        return False, None
+    return content is not None, content
+
+
+def load_view(version: int, name: str) -> Any:
+    directory = view_dir(version)
+    valid, content = _read_view(directory, name)
+    if valid:
+        return content
+    with VIEW_LOCK:
+        valid, content = _read_view(directory, name)
+        if valid:
+            return content
+        data = read_json(SCHEDULE_DIR / f"schedule_{version}.json")
+        if not data:
+            return None
+        save_views(data)
+        return _read_view(directory, name)[1]
+
+
 def rollback_to(version: int) -> Optional[ScheduleDraft]:
     target_path = SCHEDULE_DIR / f"schedule_{version}.json"
     if not target_path.exists():
@@ -206,6 +489,10 @@ def rollback_to(version: int) -> Optional[ScheduleDraft]:
     if not data:
         return None
     write_json(LATEST_FILE, data)
+    if not (view_dir(version) / "meta.json").exists():
+        save_views(data)
+    set_current_version(version, data["schedule"]["id"])
+    SCHEDULE_ITEMS.set(len(data.get("items", [])))
     append_event(
         {
             "actor": None,
@@ -213,10 +500,7 @@ def rollback_to(version: int) -> Optional[ScheduleDraft]:
             "payload": {"version": version},
         }
     )
-    return ScheduleDraft(
-        schedule=Schedule(**data["schedule"]),
-        items=[ScheduleItem(**item) for item in data.get("items", [])],
-    )
+    return draft_from_data(data)
 
 
 def log_order_created(order: Order, actor: int) -> None:
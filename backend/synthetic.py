@@ -0,0 +1,178 @@
+"""Parametrik sentetik veri üreticisi.
+
+seed.py'nin küçük örnek verisi yerine üretim ölçeğinde veri seti oluşturur:
+
+python -m backend.synthetic --out /tmp/tekiz-data --orders 5000 --workcenters 8
+
+Üretilen dizin TEKIZ_DATA_DIR ortam değişkeni ile uygulamaya verilebilir.
+"""
+import argparse
+import json
+import random
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List
+
+EVENT_TYPES = [
+    "login",
+    "order_created",
+    "schedule_generated",
+    "schedule_published",
+    "weights_updated",
+    "email_mock",
+]
+
+DEFAULT_USERS = [
+    (1, "Admin", "admin@example.com", "admin", "admin"),
+    (2, "Satış", "satis@example.com", "sales", "satis"),
+    (3, "Planlama", "planlama@example.com", "planner", "plan"),
+    (4, "Üretim", "uretim@example.com", "production", "uretim"),
+]
+
+
+@dataclass
+class SyntheticConfig:
+    orders: int = 2000
+    products: int = 200
+    setup_families: int = 20
+    workcenters: int = 6
+    matrix_density: float = 0.3
+    events: int = 50000
+    done_ratio: float = 0.2
+    seed: int = 42
+
+
+def _write(path: Path, obj: Any) -> None:
+    path.write_text(json.dumps(obj, ensure_ascii=False, default=str), encoding="utf-8")
+
+
+def _family_key(index: int) -> str:
+    return f"F{index:03d}"
+
+
+def build_dataset(config: SyntheticConfig, now: datetime) -> Dict[str, Any]:
+    from .security import hash_password
+
+    rng = random.Random(config.seed)
+    families = [_family_key(i) for i in range(max(config.setup_families, 1))]
+    users = [
+        {"id": uid, "name": name, "email": email, "role": role, "password_hash": hash_password(password)}
+        for uid, name, email, role, password in DEFAULT_USERS
+    ]
+    products = [
+        {"code": f"P-{i + 1:05d}", "name": f"Ürün {i + 1}", "setup_key": families[i % len(families)]}
+        for i in range(max(config.products, 1))
+    ]
+    workcenters = [
+        {"id": i + 1, "name": f"Hat {i + 1}", "capacity_per_shift": rng.randint(60, 160)}
+        for i in range(max(config.workcenters, 1))
+    ]
+    setup_matrix = [
+        {"from_key": a, "to_key": b, "setup_minutes": rng.randint(5, 60)}
+        for a in families
+        for b in families
+        if a != b and rng.random() < config.matrix_density
+    ]
+    orders: List[Dict[str, Any]] = []
+    for i in range(config.orders):
+        created_at = now - timedelta(days=rng.randint(0, 120), minutes=rng.randint(0, 1440))
+        done = rng.random() < config.done_ratio
+        due_date = now + timedelta(days=rng.randint(-120 if done else 0, 90), hours=rng.randint(0, 23))
+        completed_at = min(due_date - timedelta(hours=rng.randint(0, 48)), now) if done else None
+        orders.append(
+            {
+                "id": i + 1,
+                "product_code": rng.choice(products)["code"],
+                "quantity": rng.randint(5, 500),
+                "due_date": due_date.isoformat(),
+                "priority": rng.randint(1, 5),
+                "is_rush": rng.random() < 0.05,
+                "status": "done" if done else rng.choice(["new", "scheduled"]),
+                "created_at": created_at.isoformat(),
+                "completed_at": completed_at.isoformat() if completed_at else None,
+            }
+        )
+    events: List[Dict[str, Any]] = []
+    span_minutes = 90 * 24 * 60
+    for i in range(config.events):
+        timestamp = now - timedelta(minutes=span_minutes * (config.events - i) / max(config.events, 1))
+        event_type = rng.choice(EVENT_TYPES)
+        events.append(
+            {
+                "actor": rng.choice(DEFAULT_USERS)[0],
+                "event": event_type,
+                "payload": {"seq": i},
+                "timestamp": timestamp.isoformat(),
+            }
+        )
+    settings = {
+        "weights": {"w1": 3, "w2": 5, "w3": 1, "w4": 2},
+        "counters": {"orders": config.orders, "schedule": 0},
+    }
+    return {
+        "users": users,
+        "products": products,
+        "workcenters": workcenters,
+        "setup_matrix": setup_matrix,
+        "orders": orders,
+        "settings": settings,
+        "events": events,
+    }
+
+
+def generate(out_dir: Path, config: SyntheticConfig) -> Dict[str, int]:
+    out_dir = Path(out_dir)
+    schedule_dir = out_dir / "schedules"
+    schedule_dir.mkdir(parents=True, exist_ok=True)
+    dataset = build_dataset(config, datetime.utcnow())
+    for name in ("users", "products", "workcenters", "setup_matrix", "orders", "settings"):
+        _write(out_dir / f"{name}.json", dataset[name])
+    with (out_dir / "events.ndjson").open("w", encoding="utf-8") as handle:
+        for event in dataset["events"]:
+            handle.write(json.dumps(event, ensure_ascii=False) + "\n")
+    _write(schedule_dir / "draft.json", {})
+    _write(schedule_dir / "latest.json", {})
+    return {
+        name: len(dataset[name])
+        for name in ("users", "products", "workcenters", "setup_matrix", "orders", "events")
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    defaults = SyntheticConfig()
+    parser.add_argument("--orders", type=int, default=defaults.orders, help="Sipariş sayısı")
+    parser.add_argument("--products", type=int, default=defaults.products, help="Ürün sayısı")
+    parser.add_argument("--families", type=int, default=defaults.setup_families, help="Setup anahtarı ailesi sayısı")
+    parser.add_argument("--workcenters", type=int, default=defaults.workcenters, help="İş merkezi sayısı")
+    parser.add_argument("--density", type=float, default=defaults.matrix_density, help="Setup matrisi doluluk oranı (0-1)")
+    parser.add_argument("--events", type=int, default=defaults.events, help="Olay günlüğü satır sayısı")
+    parser.add_argument("--done-ratio", type=float, default=defaults.done_ratio, help="Tamamlanmış sipariş oranı (0-1)")
+    parser.add_argument("--seed", type=int, default=defaults.seed, help="Rastgele tohum")
+
+
+def config_from_args(args: argparse.Namespace) -> SyntheticConfig:
+    return SyntheticConfig(
+        orders=args.orders,
+        products=args.products,
+        setup_families=args.families,
+        workcenters=args.workcenters,
+        matrix_density=args.density,
+        events=args.events,
+        done_ratio=args.done_ratio,
+        seed=args.seed,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sentetik üretim planlama verisi üretir")
+    parser.add_argument("--out", type=Path, required=True, help="Hedef veri dizini")
+    add_arguments(parser)
+    args = parser.parse_args()
+    config = config_from_args(args)
+    counts = generate(args.out, config)
+    print(json.dumps({"config": asdict(config), "counts": counts}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+import os
+import tempfile
+
+os.environ.setdefault("TEKIZ_DATA_DIR", tempfile.mkdtemp(prefix="tekiz-test-"))
@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend import archive, storage
+from backend.main import app, list_orders
+from backend.models import Order, OrderStatus, Role, User
+from backend.security import get_current_user
+
+NOW = datetime(2026, 10, 19, 8, 0)
+
+
+def _order(order_id: int, completed_days_ago=None) -> Order:
+    completed_at = NOW - timedelta(days=completed_days_ago) if completed_days_ago is not None else None
+    return Order(
+        id=order_id,
+        product_code="P1",
+        quantity=10,
+        due_date=NOW - timedelta(days=200),
+        status=OrderStatus.done if completed_at else OrderStatus.new,
+        created_at=NOW - timedelta(days=210),
+        completed_at=completed_at,
+    )
+
+
+def _list(ids=None):
+    return list_orders(status=None, include_archived=False, archived_month=None, ids=ids, user=None)
+
+
+@pytest.fixture
+def orders():
+    rows = [_order(1, completed_days_ago=120), _order(2, completed_days_ago=150), _order(3), _order(4, completed_days_ago=5)]
+    storage.save_orders(rows)
+    for path in archive.ARCHIVE_DIR.glob("*"):
+        path.unlink()
+    return rows
+
+
+def test_archive_round_trip(orders):
+    result = archive.archive_orders(retention_days=90, now=NOW)
+    assert result.archived == 2
+    assert sorted(order.id for order in storage.load_state()["orders"]) == [3, 4]
+    restored = {order.id: order for order in archive.load_archived_orders()}
+    assert restored == {1: orders[0], 2: orders[1]}
+    assert archive.load_index()["orders"] == {"1": "2026-06", "2": "2026-05"}
+
+
+def test_rerun_after_crash_merges_without_duplicates(orders):
+    archive.archive_orders(retention_days=90, now=NOW)
+    # Bölüm ve indeks yazıldı ama orders.json güncellenemeden çökmüş gibi.
+    storage.save_orders(orders)
+    result = archive.archive_orders(retention_days=90, now=NOW)
+    assert result.months == {"2026-05": 1, "2026-06": 1}
+    assert sorted(order.id for order in archive.load_archived_orders()) == [1, 2]
+    assert sorted(order.id for order in storage.load_state()["orders"]) == [3, 4]
+
+
+def test_list_orders_by_id_reads_only_indexed_partitions(orders, monkeypatch):
+    archive.archive_orders(retention_days=90, now=NOW)
+    opened = []
+    read = archive.read_gzip_json
+    monkeypatch.setattr(archive, "read_gzip_json", lambda path: opened.append(path.name) or read(path))
+    assert [order.id for order in _list(ids=[3, 1, 99])] == [3, 1]
+    assert opened == ["orders-2026-06.json.gz"]
+
+
+@pytest.fixture
+def client():
+    app.dependency_overrides[get_current_user] = lambda: User(
+        id=1, name="Planlama", email="planner@example.com", role=Role.planner, password_hash=""
+    )
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_orders_query_parameters_over_http(orders, client):
+    archive.archive_orders(retention_days=90, now=NOW)
+    assert client.get("/orders", params={"archived_month": "2026-7"}).status_code == 422
+    response = client.get("/orders", params=[("ids", 2), ("ids", 4)])
+    assert sorted(row["id"] for row in response.json()) == [2, 4]
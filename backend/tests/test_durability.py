@@ -0,0 +1,9 @@
+from backend import storage
+from backend.storage import Durability, durability_for
+
+
+def test_policies_are_keyed_on_path_relative_to_data_dir(monkeypatch):
+    monkeypatch.setitem(storage.DURABILITY_POLICIES, "orders.json", Durability.batched)
+    assert durability_for(storage.DATA_DIR / "orders.json") is Durability.batched
+    assert durability_for(storage.DATA_DIR / "sequences" / "orders.json") is Durability.strict
+    assert durability_for(storage.SCHEDULE_DIR / "draft.json") is Durability.relaxed
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+
+from backend.models import (
+    Order,
+    OrderStatus,
+    Product,
+    Schedule,
+    ScheduleItem,
+    ScheduleStatus,
+    SetupMatrixRow,
+    Settings,
+    WorkCenter,
+)
+from backend.scheduler import SchedulerConfig, plan_from_state, rough_cut
+
+NOW = datetime(2026, 10, 19, 8, 30)
+HORIZON_END = NOW + timedelta(days=14)
+
+
+def _order(order_id: int, product_code: str = "A", due_date: datetime = NOW, **fields) -> Order:
+    fields.setdefault("quantity", 10)
+    return Order(id=order_id, product_code=product_code, due_date=due_date, created_at=NOW - timedelta(days=1), **fields)
+
+
+def _item(order_id: int, start_hour: int, end_hour: int) -> dict:
+    return ScheduleItem(
+        schedule_id=1,
+        workcenter_id=1,
+        order_id=order_id,
+        start_ts=NOW.replace(hour=start_hour, minute=0),
+        end_ts=NOW.replace(hour=end_hour, minute=0),
+        sequence_no=order_id,
+    ).dict()
+
+
+def _plan(orders, latest=None):
+    state = {
+        "settings": Settings(planning={"horizon_days": 14, "frozen_minutes": 120, "rough_cut_bucket_days": 7}),
+        "orders": orders,
+        "workcenters": [WorkCenter(id=1, name="Hat 1", capacity_per_shift=100)],
+        "setup_matrix": [
+            SetupMatrixRow(from_key="KA", to_key="KB", setup_minutes=30),
+            SetupMatrixRow(from_key="KB", to_key="KA", setup_minutes=30),
+        ],
+        "products": [Product(code="A", name="A", setup_key="KA"), Product(code="B", name="B", setup_key="KB")],
+        "latest": latest or {},
+    }
+    schedule = Schedule(id=2, version=2, status=ScheduleStatus.draft, created_at=NOW, created_by=1)
+    return plan_from_state(state, schedule, SchedulerConfig({}), NOW)
+
+
+def test_orders_beyond_horizon_go_to_rough_cut_unless_rush():
+    orders = [
+        _order(1, due_date=NOW + timedelta(days=3)),
+        _order(2, due_date=HORIZON_END + timedelta(days=1)),
+        _order(3, due_date=HORIZON_END + timedelta(days=30), is_rush=True),
+        _order(4, due_date=NOW, status=OrderStatus.done),
+    ]
+    draft = _plan(orders)
+    assert sorted(item.order_id for item in draft.items) == [1, 3]
+    assert [(bucket.order_count, bucket.period_start) for bucket in draft.rough_cut] == [(1, HORIZON_END)]
+
+
+def test_frozen_items_are_pinned_and_planning_resumes_after_them():
+    orders = [
+        _order(1, product_code="B"),
+        _order(2, product_code="B"),
+        _order(3),
+        _order(4, product_code="B"),
+        _order(5, status=OrderStatus.done),
+    ]
+    latest = {"items": [_item(5, 8, 9), _item(1, 8, 10), _item(2, 10, 11), _item(3, 11, 12)]}
+    draft = _plan(orders, latest)
+    pinned = [item for item in draft.items if item.frozen]
+    # 2 saatlik donuk bölge 10:30'da biter: sürmekte olan 1 ve bölge içinde başlayan 2
+    # sabitlenir; 10:30'dan sonra başlayan 3 ve tamamlanmış 5 sabitlenmez.
+    assert [(item.order_id, item.sequence_no, item.schedule_id) for item in pinned] == [(1, 1, 2), (2, 2, 2)]
+    assert [item.order_id for item in draft.items].count(1) == 1
+    replanned = {item.order_id: item for item in draft.items if not item.frozen}
+    assert set(replanned) == {3, 4}
+    # Son sabit iş KB anahtarında 11:00'de biter; önceki anahtar bilindiği için önce
+    # hazırlıksız KB (4) gelir, KA (3) 30 dakikalık hazırlıkla onu izler.
+    assert replanned[4].start_ts == NOW.replace(hour=11, minute=0)
+    assert replanned[4].sequence_no == 3
+    assert replanned[3].start_ts == replanned[4].end_ts + timedelta(minutes=30)
+
+def test_rough_cut_buckets_by_period_and_averages_load():
+    workcenters = [
+        WorkCenter(id=1, name="Hat 1", capacity_per_shift=100),
+        WorkCenter(id=2, name="Hat 2", capacity_per_shift=50),
+    ]
+    orders = [
+        _order(1, due_date=HORIZON_END - timedelta(hours=1), quantity=100),
+        _order(2, due_date=HORIZON_END + timedelta(days=6), quantity=100),
+        _order(3, due_date=HORIZON_END + timedelta(days=15), quantity=100),
+    ]
+    buckets = rough_cut(orders, workcenters, HORIZON_END, 7)
+    assert [(bucket.period_start, bucket.period_end, bucket.order_count) for bucket in buckets] == [
+        (HORIZON_END, HORIZON_END + timedelta(days=7), 2),
+        (HORIZON_END + timedelta(days=14), HORIZON_END + timedelta(days=21), 1),
+    ]
+    # 100 adet: Hat 1'de 50, Hat 2'de 100 dakika; kova yükü iş merkezlerinin ortalamasıdır.
+    assert [bucket.load_minutes for bucket in buckets] == [150, 75]
+    assert buckets[0].quantity == 200
+    assert rough_cut(orders, [], HORIZON_END, 7) == []
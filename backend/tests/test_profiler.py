@@ -0,0 +1,47 @@
+import asyncio
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from backend.profiler import ProfileSession, bound_to_profile, current_session, profiled_endpoint
+
+
+def _offloaded_work():
+    time.sleep(0.2)
+
+
+def _loop_busy_work():
+    deadline = time.perf_counter() + 0.2
+    while time.perf_counter() < deadline:
+        pass
+
+
+def _functions(session):
+    return {frame[2] for stack in session.stacks for frame in stack}
+
+
+def test_async_endpoints_are_not_bound_to_the_loop_thread():
+    async def endpoint():
+        return None
+
+    assert profiled_endpoint(endpoint) is endpoint
+
+
+def test_only_offloaded_work_is_sampled_for_the_session():
+    session = ProfileSession("POST", "/schedule/publish", "/schedule/publish", "route", 5)
+
+    async def profiled_request():
+        current_session.set(session)
+        await run_in_threadpool(bound_to_profile(_offloaded_work))
+
+    async def other_request():
+        await asyncio.sleep(0.02)
+        _loop_busy_work()
+
+    async def scenario():
+        await asyncio.gather(profiled_request(), other_request())
+
+    asyncio.run(scenario())
+    functions = _functions(session)
+    assert "_offloaded_work" in functions
+    assert "_loop_busy_work" not in functions
@@ -0,0 +1,45 @@
+import json
+
+from backend.rollups import EventRollups
+
+
+def _rollups(tmp_path):
+    log = tmp_path / "events.ndjson"
+    side = tmp_path / "events.rollup.json"
+
+    def load(path):
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def save(path, obj):
+        path.write_text(json.dumps(obj))
+
+    return EventRollups(side, log, load, save), log, side
+
+
+def _append(log, *events):
+    with log.open("a") as handle:
+        for event, actor, timestamp in events:
+            handle.write(json.dumps({"event": event, "actor": actor, "timestamp": timestamp}) + "\n")
+
+
+def test_series_counts_only_new_lines(tmp_path):
+    rollups, log, _ = _rollups(tmp_path)
+    _append(log, ("login", 1, "2026-10-19T08:00:00"), ("login", 2, "2026-10-19T09:00:00"))
+    rollups.catch_up()
+    _append(log, ("login", 1, "2026-10-20T08:00:00"))
+    points = rollups.series("day", event="login")
+    assert points == [
+        {"bucket": "2026-10-19", "key": None, "count": 2},
+        {"bucket": "2026-10-20", "key": None, "count": 1},
+    ]
+    assert rollups.series("hour", end="2026-10-19", group_by="actor")[-1] == {"bucket": "2026-10-19T09", "key": "2", "count": 1}
+
+
+def test_corrupt_side_file_is_rebuilt_from_log(tmp_path):
+    rollups, log, side = _rollups(tmp_path)
+    _append(log, ("login", 1, "2026-10-19T08:00:00"), ("order_created", 2, "2026-10-19T08:30:00"))
+    side.write_text('{"offset": 12, "hour": {"2026-')
+    rollups.catch_up()
+    rollups.flush()
+    assert rollups.series("day") == [{"bucket": "2026-10-19", "key": None, "count": 2}]
+    assert json.loads(side.read_text())["offset"] == log.stat().st_size
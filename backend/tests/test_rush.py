@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+from backend.models import Order, OrderStatus, Product, Schedule, ScheduleDraft, ScheduleItem, ScheduleStatus, WorkCenter
+from backend.scheduler import RushCostConfig, insert_rush_order
+
+NOW = datetime(2026, 10, 19, 8, 30)
+
+
+def _order(order_id: int, is_rush: bool = False) -> Order:
+    return Order(
+        id=order_id,
+        product_code="P-00001",
+        quantity=10,
+        due_date=NOW,
+        priority=1,
+        is_rush=is_rush,
+        status=OrderStatus.scheduled,
+        created_at=NOW - timedelta(days=1),
+    )
+
+
+def _schedule(schedule_id: int) -> Schedule:
+    return Schedule(id=schedule_id, version=schedule_id, status=ScheduleStatus.published, created_at=NOW, created_by=1)
+
+
+def _base() -> ScheduleDraft:
+    hours = [(8, 9), (9, 10), (10, 11), (12, 13)]
+    items = [
+        ScheduleItem(
+            schedule_id=1,
+            workcenter_id=1,
+            order_id=index + 1,
+            start_ts=NOW.replace(hour=start, minute=0),
+            end_ts=NOW.replace(hour=end, minute=0),
+            sequence_no=index + 1,
+        )
+        for index, (start, end) in enumerate(hours)
+    ]
+    return ScheduleDraft(schedule=_schedule(1), items=items)
+
+
+def _insert(frozen_minutes: int):
+    base = _base()
+    rush = _order(99, is_rush=True)
+    orders = {item.order_id: _order(item.order_id) for item in base.items}
+    orders[rush.id] = rush
+    return insert_rush_order(
+        base,
+        rush,
+        _schedule(2),
+        [WorkCenter(id=1, name="Hat 1", capacity_per_shift=100)],
+        {},
+        {"P-00001": Product(code="P-00001", name="Ürün", setup_key="F000")},
+        orders,
+        RushCostConfig({}),
+        now=NOW,
+        frozen_minutes=frozen_minutes,
+    )
+
+
+def test_rush_goes_right_after_running_item_without_frozen_zone():
+    _, diff = _insert(0)
+    assert diff.added[0].start_ts == NOW.replace(hour=9, minute=0)
+    assert {item.order_id for item in diff.moved} == {2, 3}
+
+
+def test_rush_does_not_shift_items_inside_frozen_zone():
+    _, diff = _insert(120)
+    assert diff.added[0].start_ts >= NOW.replace(hour=11, minute=0)
+    assert not {item.order_id for item in diff.moved} & {1, 2, 3}
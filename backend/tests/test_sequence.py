@@ -0,0 +1,27 @@
+import json
+
+from backend.sequence import SequenceStore
+
+
+def test_ids_are_reserved_in_blocks(tmp_path):
+    store = SequenceStore(tmp_path, block_size=5)
+    assert [store.next_id("orders") for _ in range(3)] == [1, 2, 3]
+    assert json.loads((tmp_path / "orders.json").read_text())["high_water"] == 5
+    assert [store.next_id("orders") for _ in range(3)] == [4, 5, 6]
+    assert json.loads((tmp_path / "orders.json").read_text())["high_water"] == 10
+
+
+def test_recreated_store_never_reuses_ids(tmp_path):
+    first = SequenceStore(tmp_path, block_size=5)
+    issued = [first.next_id("orders") for _ in range(2)]
+    second = SequenceStore(tmp_path, block_size=5)
+    issued += [second.next_id("orders") for _ in range(7)]
+    assert len(issued) == len(set(issued))
+    assert min(issued[2:]) > 5
+
+
+def test_ensure_at_least_raises_high_water(tmp_path):
+    store = SequenceStore(tmp_path, block_size=5)
+    store.next_id("schedule")
+    store.ensure_at_least("schedule", 40)
+    assert store.next_id("schedule") == 41
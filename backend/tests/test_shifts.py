@@ -0,0 +1,63 @@
+from datetime import datetime, time
+
+import pytest
+from pydantic import ValidationError
+
+from backend.models import BreakWindow, Order, OrderStatus, ShiftWindow, WorkCenter
+from backend.scheduler import processing_time
+from backend.shifts import AvailabilityIndex, shift_minutes
+
+MONDAY = datetime(2026, 10, 19)
+
+
+def _workcenter(*shifts: ShiftWindow, capacity: int = 100) -> WorkCenter:
+    return WorkCenter(id=1, name="Hat 1", capacity_per_shift=capacity, shifts=list(shifts))
+
+
+def _order(quantity: int) -> Order:
+    return Order(
+        id=1,
+        product_code="P-00001",
+        quantity=quantity,
+        due_date=MONDAY,
+        priority=1,
+        is_rush=False,
+        status=OrderStatus.new,
+        created_at=MONDAY,
+    )
+
+
+def test_shift_minutes_subtracts_breaks():
+    day_shift = ShiftWindow(start=time(6), end=time(14), breaks=[BreakWindow(start=time(10), end=time(10, 30))])
+    assert shift_minutes(_workcenter(day_shift)) == 450
+
+
+def test_overnight_shift_with_break_after_midnight():
+    night_shift = ShiftWindow(start=time(22), end=time(6), breaks=[BreakWindow(start=time(2), end=time(2, 30))])
+    assert shift_minutes(_workcenter(night_shift)) == 450
+
+
+def test_processing_time_uses_net_shift_length():
+    day_shift = ShiftWindow(start=time(6), end=time(14), breaks=[BreakWindow(start=time(10), end=time(10, 30))])
+    assert processing_time(_order(100), _workcenter(day_shift, capacity=100)) == 450
+
+
+def test_availability_matches_shift_minutes():
+    day_shift = ShiftWindow(start=time(6), end=time(14), breaks=[BreakWindow(start=time(10), end=time(10, 30))])
+    index = AvailabilityIndex(_workcenter(day_shift), MONDAY)
+    assert index.available_minutes(MONDAY, datetime(2026, 10, 20)) == 450
+    assert not index.is_available(datetime(2026, 10, 19, 10, 15))
+    assert index.next_free(datetime(2026, 10, 19, 10, 15)) == datetime(2026, 10, 19, 10, 30)
+    assert index.advance(datetime(2026, 10, 19, 9, 50), 20) == datetime(2026, 10, 19, 10, 40)
+
+
+def test_advance_skips_non_working_days():
+    weekdays_only = ShiftWindow(start=time(6), end=time(14), weekdays=[0, 1, 2, 3, 4])
+    index = AvailabilityIndex(_workcenter(weekdays_only), MONDAY)
+    assert index.advance(datetime(2026, 10, 23, 13), 120) == datetime(2026, 10, 26, 7)
+
+
+@pytest.mark.parametrize("weekdays", [[], [7], [-1]])
+def test_shift_weekdays_are_validated(weekdays):
+    with pytest.raises(ValidationError):
+        ShiftWindow(start=time(6), end=time(14), weekdays=weekdays)
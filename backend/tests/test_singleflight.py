@@ -0,0 +1,73 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from backend.singleflight import SingleFlight
+
+
+def _slow(calls, value="plan", delay=0.05):
+    def compute():
+        calls.append(threading.get_ident())
+        time.sleep(delay)
+        return value
+
+    return compute
+
+
+def test_concurrent_callers_share_one_computation():
+    calls = []
+
+    async def scenario():
+        flight = SingleFlight()
+        compute = _slow(calls)
+        return await asyncio.gather(*(flight.do(("/schedule/current", 1), compute) for _ in range(10)))
+
+    assert asyncio.run(scenario()) == ["plan"] * 10
+    assert len(calls) == 1
+
+
+def test_different_keys_compute_separately():
+    calls = []
+
+    async def scenario():
+        flight = SingleFlight()
+        compute = _slow(calls)
+        return await asyncio.gather(flight.do(("/kpi/summary", 1), compute), flight.do(("/kpi/summary", 2), compute))
+
+    assert asyncio.run(scenario()) == ["plan", "plan"]
+    assert len(calls) == 2
+
+
+def test_cancelled_leader_does_not_fail_followers():
+    calls = []
+
+    async def scenario():
+        flight = SingleFlight()
+        compute = _slow(calls, delay=0.1)
+        leader = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(scenario()) == "plan"
+    assert len(calls) == 1
+
+
+def test_errors_are_shared_and_key_is_released():
+    def fail():
+        time.sleep(0.02)
+        raise ValueError("bozuk")
+
+    async def scenario():
+        flight = SingleFlight()
+        results = await asyncio.gather(flight.do("key", fail), flight.do("key", fail), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+        return await flight.do("key", lambda: "tekrar")
+
+    assert asyncio.run(scenario()) == "tekrar"
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+from backend import storage
+from backend.models import Schedule, ScheduleDraft, ScheduleItem, ScheduleStatus
+
+NOW = datetime(2026, 10, 19, 8, 0)
+
+
+def _publish(version: int) -> ScheduleDraft:
+    schedule = Schedule(id=version, version=version, status=ScheduleStatus.published, created_at=NOW, created_by=1)
+    items = [
+        ScheduleItem(
+            schedule_id=version,
+            workcenter_id=1,
+            order_id=order_id,
+            start_ts=NOW + timedelta(hours=order_id),
+            end_ts=NOW + timedelta(hours=order_id + 1),
+            sequence_no=order_id,
+        )
+        for order_id in (1, 2, 3)
+    ]
+    draft = ScheduleDraft(schedule=schedule, items=items)
+    storage.publish_schedule(draft)
+    return draft
+
+
+def test_empty_or_torn_view_file_is_rebuilt():
+    _publish(101)
+    path = storage.view_dir(101) / "workcenter_1.json"
+    for damaged in ("", '[{"order_id": 1,'):
+        path.write_text(damaged)
+        assert [item["order_id"] for item in storage.load_view(101, "workcenter_1.json")] == [1, 2, 3]
+
+
+def test_view_missing_by_design_does_not_rebuild():
+    _publish(102)
+    meta = storage.view_dir(102) / "meta.json"
+    before = meta.stat().st_mtime_ns
+    assert storage.load_view(102, "workcenter_9.json") is None
+    assert meta.stat().st_mtime_ns == before
+
+
+def test_old_view_directories_are_pruned():
+    for version in range(110, 116):
+        _publish(version)
+    kept = sorted(int(path.name.split("_")[1]) for path in storage.SCHEDULE_DIR.glob("views_*"))
+    assert kept[-storage.VIEW_HISTORY :] == [113, 114, 115]
+    assert len(kept) == storage.VIEW_HISTORY
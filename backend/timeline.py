@@ -0,0 +1,31 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from .models import ScheduleItem
+
+
+class WorkcenterTimeline:
+    """Bir hattın kalemlerini başlangıç zamanına göre sıralı tutan aralık indeksi."""
+
+    def __init__(self, workcenter_id: int, items: Iterable[ScheduleItem]) -> None:
+        self.workcenter_id = workcenter_id
+        self.items: List[ScheduleItem] = sorted(items, key=lambda item: (item.start_ts, item.sequence_no))
+        self.starts: List[datetime] = [item.start_ts for item in self.items]
+
+    def first_index_at_or_after(self, ts: datetime) -> int:
+        return bisect_left(self.starts, ts)
+
+    def item_at(self, ts: datetime) -> Optional[ScheduleItem]:
+        index = bisect_right(self.starts, ts) - 1
+        if index >= 0 and self.items[index].end_ts > ts:
+            return self.items[index]
+        return None
+
+
+def build_timelines(items: Iterable[ScheduleItem]) -> Dict[int, WorkcenterTimeline]:
+    grouped: Dict[int, List[ScheduleItem]] = defaultdict(list)
+    for item in items:
+        grouped[item.workcenter_id].append(item)
+    return {workcenter_id: WorkcenterTimeline(workcenter_id, wc_items) for workcenter_id, wc_items in grouped.items()}
@@ -0,0 +1,62 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Union
+
+ORDER_SHARDS = 64
+
+
+def parse_ts(value: Union[str, datetime]) -> datetime:
+    """Zaman damgasını planın kullandığı saf (tz'siz) UTC değerine çevirir."""
+    ts = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    if ts.tzinfo is not None:
+        ts = ts.astimezone(timezone.utc).replace(tzinfo=None)
+    return ts
+
+
+def order_shard(order_id: int) -> int:
+    return order_id % ORDER_SHARDS
+
+
+def _daily_minutes(start: datetime, end: datetime) -> Dict[str, float]:
+    minutes: Dict[str, float] = {}
+    cursor = start
+    while cursor < end:
+        next_day = datetime.combine(cursor.date() + timedelta(days=1), datetime.min.time())
+        boundary = min(next_day, end)
+        key = cursor.date().isoformat()
+        minutes[key] = minutes.get(key, 0.0) + (boundary - cursor).total_seconds() / 60
+        cursor = boundary
+    return minutes
+
+
+def materialize(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Yayınlanan plandan hat kuyruklarını, sipariş konumlarını ve günlük yükü üretir."""
+    queues: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for raw in data.get("items", []):
+        item = dict(raw)
+        item["start_ts"] = parse_ts(item["start_ts"])
+        item["end_ts"] = parse_ts(item["end_ts"])
+        queues[item["workcenter_id"]].append(item)
+    order_positions: Dict[int, Dict[str, List[Dict[str, Any]]]] = defaultdict(lambda: defaultdict(list))
+    daily_load: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+    for workcenter_id, items in queues.items():
+        items.sort(key=lambda item: (item["start_ts"], item["sequence_no"]))
+        for position, item in enumerate(items):
+            item["position"] = position
+            order_positions[order_shard(item["order_id"])][str(item["order_id"])].append(item)
+            for day, minutes in _daily_minutes(item["start_ts"], item["end_ts"]).items():
+                daily_load[day][str(workcenter_id)] += minutes
+    schedule = data.get("schedule", {})
+    return {
+        "meta": {
+            "schedule_id": schedule.get("id"),
+            "version": schedule.get("version"),
+            "item_count": sum(len(items) for items in queues.values()),
+            "workcenters": {str(wc_id): len(items) for wc_id, items in sorted(queues.items())},
+        },
+        "queues": dict(queues),
+        "orders": {shard: dict(entries) for shard, entries in order_positions.items()},
+        "daily_load": {
+            day: {wc_id: round(minutes, 1) for wc_id, minutes in loads.items()} for day, loads in sorted(daily_load.items())
+        },
+    }
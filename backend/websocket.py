@@ -2,6 +2,8 @@ from typing import Dict
 
 from fastapi import WebSocket
 
+from .metrics import WEBSOCKET_CONNECTIONS, span
+
 
 class WebsocketManager:
     def __init__(self) -> None:
@@ -18,13 +20,15 @@ class WebsocketManager:
 
     async def broadcast(self, message: dict) -> None:
         stale = []
-        for connection_id, websocket in self.active_connections.items():
-            try:
-                await websocket.send_json(message)
-            except Exception:
-                stale.append(connection_id)
+        with span("websocket.broadcast", message.get("type", "")):
+            for connection_id, websocket in list(self.active_connections.items()):
+                try:
+                    await websocket.send_json(message)
+                except Exception:
+                    stale.append(connection_id)
         for connection_id in stale:
             self.disconnect(connection_id)
 
 
 manager = WebsocketManager()
+WEBSOCKET_CONNECTIONS.set_function(lambda: len(manager.active_connections))
@@ -102,7 +102,7 @@ const BoardPage: React.FC = () => {
           </div>
           <div className="rounded bg-white p-4 shadow">
             <p className="text-xs uppercase text-slate-500">Ortalama Yüklenme</p>
-            <p className="text-lg font-semibold text-slate-800">{Math.round(kpi.avg_utilization)} dk</p>
+            <p className="text-lg font-semibold text-slate-800">%{Math.round(kpi.avg_utilization)}</p>
           </div>
         </div>
       )}
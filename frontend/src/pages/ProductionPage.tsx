@@ -1,4 +1,4 @@
-import React, { useEffect, useMemo, useState } from 'react';
+import React, { useEffect, useMemo, useRef, useState } from 'react';
 import api from '../services/api';
 
 type ScheduleItem = {
@@ -17,9 +17,34 @@ type ScheduleDraft = {
   items: ScheduleItem[];
 };
 
+type ScheduleDiff = {
+  type: 'plan_patched';
+  schedule_id: number;
+  base_version: number;
+  version: number;
+  added: ScheduleItem[];
+  moved: ScheduleItem[];
+};
+
+const itemKey = (item: ScheduleItem) => `${item.workcenter_id}:${item.order_id}:${item.sequence_no}`;
+
+const applyDiff = (current: ScheduleDraft, diff: ScheduleDiff): ScheduleDraft => {
+  const moved = new Map(diff.moved.map((item) => [itemKey(item), item] as const));
+  return {
+    schedule: { id: diff.schedule_id, version: diff.version },
+    items: [...current.items.map((item) => moved.get(itemKey(item)) ?? item), ...diff.added]
+  };
+};
+
 const ProductionPage: React.FC = () => {
   const [schedule, setSchedule] = useState<ScheduleDraft | null>(null);
   const [status, setStatus] = useState<string | null>('Plan bilgisi yükleniyor...');
+  const scheduleRef = useRef<ScheduleDraft | null>(null);
+
+  const showSchedule = (next: ScheduleDraft | null) => {
+    scheduleRef.current = next;
+    setSchedule(next);
+  };
 
   const grouped = useMemo(() => {
     if (!schedule) return [] as Array<{ workcenter: number; items: ScheduleItem[] }>;
@@ -29,17 +54,17 @@ const ProductionPage: React.FC = () => {
     });
     return Array.from(map.entries()).map(([workcenter, items]) => ({
       workcenter,
-      items: items.sort((a, b) => a.sequence_no - b.sequence_no)
+      items: items.sort((a, b) => a.start_ts.localeCompare(b.start_ts) || a.sequence_no - b.sequence_no)
     }));
   }, [schedule]);
 
   const loadCurrent = async () => {
     try {
       const response = await api.get<ScheduleDraft>('/schedule/current');
-      setSchedule(response.data);
+      showSchedule(response.data);
       setStatus(`Versiyon ${response.data.schedule.version}`);
     } catch (error) {
-      setSchedule(null);
+      showSchedule(null);
       setStatus('Yayınlı plan bulunamadı');
     }
   };
@@ -52,7 +77,22 @@ const ProductionPage: React.FC = () => {
       (import.meta.env.VITE_WS_BASE as string | undefined) ??
       `${window.location.protocol === 'https:' ? 'wss' : 'ws'}://${window.location.host}`;
     const ws = new WebSocket(`${wsHost}${basePath.replace(/\/$/, '')}/realtime`);
-    ws.onmessage = () => {
+    ws.onmessage = (event: MessageEvent) => {
+      let message: { type?: string } = {};
+      try {
+        message = JSON.parse(event.data);
+      } catch (error) {
+        message = {};
+      }
+      const current = scheduleRef.current;
+      if (message.type === 'plan_patched' && current) {
+        const diff = message as ScheduleDiff;
+        if (current.schedule.version === diff.base_version) {
+          showSchedule(applyDiff(current, diff));
+          setStatus(`Versiyon ${diff.version}`);
+          return;
+        }
+      }
       loadCurrent();
     };
     ws.onopen = () => setStatus((prev) => prev ?? 'Canlı bağlantı hazır');